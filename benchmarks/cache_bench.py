@@ -0,0 +1,505 @@
+"""
+Microbenchmarks for the cache subsystem.
+
+Measures the hot path of cached requests at several cache sizes
+(default 1k, 10k and 100k entries):
+
+  make_key            exact-cache key hashing
+  record_*            cache record encode/decode (short and long answers)
+  exact_*             exact cache get/set round trips, single and MGET batch
+  semantic_*          semantic index lookup (hit and miss) and store
+  eviction            one capacity eviction pass of the semantic cache
+  check_cache_*       cache_manager end to end (exact hit, semantic lookup)
+  embedding_batch_*   embedding throughput (only with --embeddings)
+
+and memory per entry for both tiers. Results are written as JSON so
+runs can be compared, e.g. before and after changing the semantic index
+or the embedding backend:
+
+    python benchmarks/cache_bench.py -o before.json
+    python benchmarks/cache_bench.py -o after.json --compare before.json
+
+Redis is fakeredis unless --redis local is given (then the Redis in
+REDIS_HOST/REDIS_PORT/REDIS_DB is used and FLUSHDB'd: pick a spare DB).
+Without --embeddings, check_cache is fed random precomputed embeddings,
+so no model is loaded and only the cache work is measured.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+CONFIG = {
+    "model_name": "llama-3.1-8b-instant",
+    "temperature": 0.0,
+    "assistant_type": "General",
+    "llm_type": "Groq",
+}
+
+SHORT_ANSWER = "Paris is the capital of France."
+LONG_ANSWER = " ".join(
+    f"Paragraph {i}: caching avoids repeated LLM calls for identical questions."
+    for i in range(40)
+)
+SUGGESTIONS = ["Compare the options", "Show an example", "Explain the tradeoffs"]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--ops", type=int, default=1000, help="timed calls per case")
+    parser.add_argument("--dim", type=int, default=384, help="embedding dimension")
+    parser.add_argument("--redis", choices=["fake", "local"], default="fake")
+    parser.add_argument(
+        "--embeddings", action="store_true", help="also load the embedding model"
+    )
+    parser.add_argument("-o", "--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="earlier JSON report to compare against")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+# ---------------------------------------------------------
+# Timing helpers
+# ---------------------------------------------------------
+def stats(name: str, size, timings: list, **extra) -> dict:
+    timings = np.asarray(timings) * 1e6
+    result = {
+        "name": name,
+        "size": size,
+        "ops": len(timings),
+        "mean_us": round(float(timings.mean()), 2),
+        "p50_us": round(float(np.percentile(timings, 50)), 2),
+        "p95_us": round(float(np.percentile(timings, 95)), 2),
+        "p99_us": round(float(np.percentile(timings, 99)), 2),
+        "ops_per_s": round(float(1e6 / timings.mean()), 1),
+    }
+    result.update(extra)
+    return result
+
+
+def time_calls(fn, args_list: list) -> list:
+    timings = []
+    for args in args_list:
+        started = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+async def time_async_calls(fn, args_list: list) -> list:
+    timings = []
+    for args in args_list:
+        started = time.perf_counter()
+        await fn(*args)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def query(i: int) -> str:
+    return f"benchmark question number {i} about cache performance"
+
+
+def random_unit(rng, rows: int, dim: int) -> np.ndarray:
+    vectors = rng.standard_normal((rows, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+# ---------------------------------------------------------
+# Size-independent cases
+# ---------------------------------------------------------
+def bench_keys_and_records(args) -> list:
+    from multi_agent_app.cache.cache_record import (
+        decode_record,
+        encode_record,
+        make_entry,
+    )
+    from multi_agent_app.cache.exact_cache import make_key
+
+    results = [
+        stats(
+            "make_key",
+            None,
+            time_calls(make_key, [(query(i), CONFIG) for i in range(args.ops)]),
+        )
+    ]
+
+    for label, answer in (("short", SHORT_ANSWER), ("long", LONG_ANSWER)):
+        entry = make_entry(answer, SUGGESTIONS, "general", CONFIG)
+        record = encode_record(entry)
+        raw_bytes = len(json.dumps(entry).encode("utf-8"))
+
+        results.append(
+            stats(
+                f"record_encode_{label}",
+                None,
+                time_calls(encode_record, [(entry,)] * args.ops),
+                record_bytes=len(record),
+                json_bytes=raw_bytes,
+            )
+        )
+        results.append(
+            stats(
+                f"record_decode_{label}",
+                None,
+                time_calls(decode_record, [(record,)] * args.ops),
+            )
+        )
+
+    return results
+
+
+# ---------------------------------------------------------
+# Exact cache (Redis)
+# ---------------------------------------------------------
+async def fill_exact(size: int, record: bytes):
+    """Write `size` entries in the exact_store layout, pipelined"""
+    from multi_agent_app.cache.exact_cache import FRESH_SUFFIX, make_key
+    from multi_agent_app.cache.redis_client import get_binary_redis
+
+    client = get_binary_redis()
+    await client.flushdb()
+
+    for start in range(0, size, 1000):
+        async with client.pipeline(transaction=False) as pipe:
+            for i in range(start, min(start + 1000, size)):
+                key = make_key(query(i), CONFIG)
+                pipe.set(key, record, ex=7200)
+                pipe.set(key + FRESH_SUFFIX, 1, ex=3600)
+            await pipe.execute()
+
+
+async def exact_bytes_per_entry(record: bytes):
+    from multi_agent_app.cache.exact_cache import FRESH_SUFFIX, make_key
+    from multi_agent_app.cache.redis_client import get_binary_redis
+
+    key = make_key(query(0), CONFIG)
+    try:
+        client = get_binary_redis()
+        return await client.memory_usage(key) + await client.memory_usage(
+            key + FRESH_SUFFIX
+        )
+    except Exception:
+        # fakeredis has no MEMORY USAGE: count the payload only
+        return 2 * len(key) + len(FRESH_SUFFIX) + len(record) + 1
+
+
+async def bench_exact(size: int, args, rng) -> list:
+    from multi_agent_app.cache.cache_record import encode_record, make_entry
+    from multi_agent_app.cache.exact_cache import (
+        exact_lookup,
+        exact_lookup_many,
+        exact_store,
+    )
+
+    record = encode_record(make_entry(LONG_ANSWER, SUGGESTIONS, "general", CONFIG))
+    await fill_exact(size, record)
+
+    hits = [(query(int(i)), CONFIG) for i in rng.integers(0, size, args.ops)]
+    misses = [(query(size + i), CONFIG) for i in range(args.ops)]
+    batches = [
+        ([(query(int(i)), CONFIG) for i in rng.integers(0, size, 32)],)
+        for _ in range(max(1, args.ops // 32))
+    ]
+    writes = [(query(size + i), record, CONFIG, 3600) for i in range(args.ops)]
+
+    return [
+        stats("exact_lookup_hit", size, await time_async_calls(exact_lookup, hits)),
+        stats(
+            "exact_lookup_miss", size, await time_async_calls(exact_lookup, misses)
+        ),
+        stats(
+            "exact_lookup_many_32",
+            size,
+            await time_async_calls(exact_lookup_many, batches),
+        ),
+        stats(
+            "exact_store",
+            size,
+            await time_async_calls(exact_store, writes),
+            bytes_per_entry=await exact_bytes_per_entry(record),
+        ),
+    ]
+
+
+# ---------------------------------------------------------
+# Semantic cache (in-memory index)
+# ---------------------------------------------------------
+def fill_semantic(size: int, args, rng, record: bytes):
+    """Reset the semantic cache to one partition holding `size` entries"""
+    from multi_agent_app.cache import semantic_cache
+    from multi_agent_app.config.settings import settings
+
+    semantic_cache.semantic_store.clear()
+
+    # created here so get_partition never asks the embedding model for
+    # its dimension
+    index = semantic_cache.PartitionIndex(
+        args.dim, dtype=settings.SEMANTIC_CACHE_DTYPE
+    )
+    semantic_cache.semantic_store[semantic_cache.partition_key(CONFIG, False)] = index
+
+    embeddings = random_unit(rng, size, args.dim)
+    index.extend(
+        [query(i) for i in range(size)],
+        embeddings,
+        [record] * size,
+        np.full(size, time.time() + 3600),
+    )
+    return index, embeddings
+
+
+def bench_semantic(size: int, args, rng) -> list:
+    from multi_agent_app.cache import semantic_cache
+    from multi_agent_app.cache.cache_record import encode_record, make_entry
+    from multi_agent_app.config.settings import settings
+
+    record = encode_record(make_entry(LONG_ANSWER, SUGGESTIONS, "general", CONFIG))
+    settings.SEMANTIC_CACHE_MAX_ENTRIES = size * 10
+    index, embeddings = fill_semantic(size, args, rng, record)
+
+    # near-duplicates of stored rows score above SIM_THRESHOLD
+    rows = rng.integers(0, size, args.ops)
+    near = embeddings[rows] + 0.01 * random_unit(rng, args.ops, args.dim)
+    near /= np.linalg.norm(near, axis=1, keepdims=True)
+
+    hits = [(query(int(r)), CONFIG, False, e) for r, e in zip(rows, near)]
+    misses = [
+        ("unrelated", CONFIG, False, e) for e in random_unit(rng, args.ops, args.dim)
+    ]
+    bytes_per_entry = index.nbytes / max(1, index.size)
+
+    results = [
+        stats(
+            "semantic_lookup_hit",
+            size,
+            time_calls(semantic_cache.semantic_lookup, hits),
+        ),
+        stats(
+            "semantic_lookup_miss",
+            size,
+            time_calls(semantic_cache.semantic_lookup, misses),
+        ),
+    ]
+
+    writes = [
+        (query(size + i), record, CONFIG, False, e, 3600)
+        for i, e in enumerate(random_unit(rng, args.ops, args.dim))
+    ]
+    results.append(
+        stats(
+            "semantic_store",
+            size,
+            time_calls(semantic_cache.semantic_store_response, writes),
+            bytes_per_entry=round(bytes_per_entry, 1),
+            dtype=settings.SEMANTIC_CACHE_DTYPE,
+        )
+    )
+    return results
+
+
+def bench_eviction(size: int, args, rng) -> list:
+    """Time enforce_limits when the cache is one entry over its limit"""
+    from multi_agent_app.cache import semantic_cache
+    from multi_agent_app.cache.cache_record import encode_record, make_entry
+    from multi_agent_app.config.settings import settings
+
+    record = encode_record(make_entry(SHORT_ANSWER, SUGGESTIONS, "general", CONFIG))
+    timings = []
+    evicted = 0
+
+    for _ in range(5):
+        fill_semantic(size + 1, args, rng, record)
+        settings.SEMANTIC_CACHE_MAX_ENTRIES = size
+
+        started = time.perf_counter()
+        evicted = semantic_cache.enforce_limits()
+        timings.append(time.perf_counter() - started)
+
+    return [stats("eviction", size, timings, evicted_per_pass=evicted)]
+
+
+# ---------------------------------------------------------
+# cache_manager end to end
+# ---------------------------------------------------------
+async def bench_check_cache(size: int, args, rng) -> list:
+    """check_cache over caches filled by bench_exact and bench_semantic"""
+    from multi_agent_app.cache import cache_manager
+    from multi_agent_app.config.settings import settings
+
+    settings.SEMANTIC_CACHE_MAX_ENTRIES = size * 10
+
+    if not args.embeddings:
+        vectors = itertools.cycle(random_unit(rng, args.ops, args.dim))
+
+        async def precomputed(text):
+            return next(vectors)
+
+        cache_manager.aget_embedding = precomputed
+
+    exact_hits = [
+        (query(int(i)), CONFIG, False) for i in rng.integers(0, size, args.ops)
+    ]
+    misses = [(f"new question {i}", CONFIG, False) for i in range(args.ops)]
+
+    return [
+        stats(
+            "check_cache_exact_hit",
+            size,
+            await time_async_calls(cache_manager.check_cache, exact_hits),
+        ),
+        stats(
+            "check_cache_semantic_lookup",
+            size,
+            await time_async_calls(cache_manager.check_cache, misses),
+            embeddings="model" if args.embeddings else "precomputed",
+        ),
+    ]
+
+
+def bench_embeddings(args) -> list:
+    from multi_agent_app.cache.embeddings import get_backend
+    from multi_agent_app.config.settings import settings
+
+    backend = get_backend()
+    backend.encode(["warm up"])
+    results = []
+
+    for batch_size in (1, 8, 32, 64):
+        texts = [[query(i + n) for i in range(batch_size)] for n in range(20)]
+        timings = time_calls(backend.encode, [(batch,) for batch in texts])
+        results.append(
+            stats(
+                f"embedding_batch_{batch_size}",
+                None,
+                timings,
+                texts_per_s=round(batch_size / float(np.mean(timings)), 1),
+                backend=settings.EMBEDDING_BACKEND,
+            )
+        )
+
+    return results
+
+
+# ---------------------------------------------------------
+# Report
+# ---------------------------------------------------------
+def metadata(args) -> dict:
+    from multi_agent_app.cache import semantic_cache
+    from multi_agent_app.config.settings import settings
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=ROOT,
+        ).stdout.strip()
+    except OSError:
+        commit = None
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": commit or None,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "faiss": semantic_cache.faiss is not None,
+        "semantic_dtype": settings.SEMANTIC_CACHE_DTYPE,
+        "cache_compression": settings.CACHE_COMPRESSION,
+        "embedding_backend": settings.EMBEDDING_BACKEND if args.embeddings else None,
+        "dim": args.dim,
+        "redis": args.redis,
+        "ops": args.ops,
+    }
+
+
+def compare(results: list, baseline_path: str):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["name"], r["size"]): r for r in json.load(f)["results"]}
+
+    print(f"\n{'case':<32}{'size':>8}{'p50 us':>12}{'before':>12}{'change':>10}")
+    for r in results:
+        old = baseline.get((r["name"], r["size"]))
+        if old is None:
+            continue
+        change = (r["p50_us"] / old["p50_us"] - 1) * 100 if old["p50_us"] else 0.0
+        print(
+            f"{r['name']:<32}{str(r['size'] or '-'):>8}"
+            f"{r['p50_us']:>12}{old['p50_us']:>12}{change:>+9.1f}%"
+        )
+
+
+def print_results(results: list):
+    print(f"{'case':<32}{'size':>8}{'p50 us':>12}{'p99 us':>12}{'ops/s':>12}")
+    for r in results:
+        print(
+            f"{r['name']:<32}{str(r['size'] or '-'):>8}"
+            f"{r['p50_us']:>12}{r['p99_us']:>12}{r['ops_per_s']:>12}"
+        )
+
+
+async def run(args) -> list:
+    rng = np.random.default_rng(args.seed)
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    results = bench_keys_and_records(args)
+
+    if args.embeddings:
+        results += bench_embeddings(args)
+
+    for size in sizes:
+        print(f"size {size} ...", file=sys.stderr)
+        results += await bench_exact(size, args, rng)
+        results += bench_semantic(size, args, rng)
+        results += await bench_check_cache(size, args, rng)
+        results += bench_eviction(size, args, rng)
+
+    return results
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # no snapshot files from benchmark entries
+    os.environ["SEMANTIC_SNAPSHOT_DIR"] = ""
+    os.environ["SEMANTIC_CACHE_BACKEND"] = "memory"
+
+    if args.redis == "fake":
+        import fakeredis
+
+        from multi_agent_app.cache import redis_client
+
+        server = fakeredis.FakeServer()
+        redis_client._client = fakeredis.FakeAsyncRedis(
+            server=server, decode_responses=True
+        )
+        redis_client._binary_client = fakeredis.FakeAsyncRedis(server=server)
+
+    results = asyncio.run(run(args))
+    report = {"meta": metadata(args), "results": results}
+
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nwrote {args.output}", file=sys.stderr)
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Deterministic stand-in for the embedding model, for benchmarks.
+
+FakeEmbeddingBackend maps every word to a unit vector seeded by a hash
+of the word and embeds a text as the sum of its word vectors. Repeated
+texts get identical embeddings and texts sharing most of their words
+score close to each other, so both cache tiers behave plausibly without
+downloading or running the real model.
+
+install() replaces embeddings.load_backend, so the backend loads the
+fake on first use instead of EMBEDDING_BACKEND.
+"""
+
+import hashlib
+
+import numpy as np
+
+from multi_agent_app.cache.embedding_backends import EmbeddingBackend
+
+# same size as the default all-MiniLM-L6-v2 model
+DIMENSION = 384
+
+
+class FakeEmbeddingBackend(EmbeddingBackend):
+
+    name = "fake"
+
+    def __init__(self, dimension: int = DIMENSION):
+        self.dim = dimension
+        self._words = {}
+
+    def dimension(self) -> int:
+        return self.dim
+
+    def _word(self, word: str) -> np.ndarray:
+        vector = self._words.get(word)
+        if vector is None:
+            seed = int.from_bytes(hashlib.sha256(word.encode("utf-8")).digest()[:8])
+            vector = np.random.default_rng(seed).standard_normal(self.dim)
+            vector = (vector / np.linalg.norm(vector)).astype(np.float32)
+            self._words[word] = vector
+        return vector
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        rows = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in zip(rows, texts):
+            for word in text.lower().split():
+                row += self._word(word)
+        return rows
+
+
+def install(dimension: int = DIMENSION):
+    """Make the backend load FakeEmbeddingBackend instead of the model"""
+    from multi_agent_app.cache import embeddings
+
+    embeddings.load_backend = lambda *args, **kwargs: FakeEmbeddingBackend(dimension)
@@ -0,0 +1,178 @@
+"""
+Deterministic stand-in for the Groq/OpenAI chat models, for benchmarks.
+
+FakeChatModel answers every prompt with text derived from a hash of the
+last user message, in the ANSWER/SUGGESTIONS format the agent expects.
+It waits `latency` seconds before the first token and then produces
+`tokens_per_second` tokens; both waits are asyncio sleeps, so many
+concurrent calls behave like a remote provider and not like CPU work.
+Usage metadata is reported as a provider would.
+
+install() replaces core.helper.get_llm (and the reference imported by
+core.agent) so the backend runs without API keys or network access.
+"""
+
+import asyncio
+import hashlib
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+)
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+WORDS = (
+    "cache model answer request latency token stream vector index query "
+    "result agent memory search context redis embedding score batch"
+).split()
+
+
+class FakeChatModel(BaseChatModel):
+
+    model_name: str = "fake"
+    temperature: float = 0.0
+    streaming: bool = False
+
+    # seconds before the first token, and generation speed
+    latency: float = 0.5
+    tokens_per_second: float = 200.0
+    answer_tokens: int = 60
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def bind_tools(self, tools, **kwargs):
+        # the fake never calls tools, so the agent gets a plain answer
+        return self
+
+    # ------------------------------------------------------------------
+    # Deterministic output
+    # ------------------------------------------------------------------
+    def _tokens(self, messages: List[BaseMessage]) -> List[str]:
+        prompt = next(
+            (m.content for m in reversed(messages) if isinstance(m, HumanMessage)), ""
+        )
+        seed = hashlib.sha256(str(prompt).encode("utf-8")).digest()
+
+        words = [
+            WORDS[seed[i % len(seed)] % len(WORDS)] for i in range(self.answer_tokens)
+        ]
+        text = (
+            "ANSWER:\n" + " ".join(words) + ".\n\n"
+            "SUGGESTIONS:\n"
+            "1. Compare the options\n"
+            "2. Show an example\n"
+            "3. Explain the tradeoffs"
+        )
+        # one token per word, spaces kept so the chunks join back exactly
+        return [word + " " for word in text.split(" ")]
+
+    def _usage(self, messages: List[BaseMessage], tokens: List[str]) -> dict:
+        prompt_tokens = sum(len(str(m.content).split()) for m in messages)
+        return {
+            "input_tokens": prompt_tokens,
+            "output_tokens": len(tokens),
+            "total_tokens": prompt_tokens + len(tokens),
+        }
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    # ------------------------------------------------------------------
+    # LangChain interface
+    # ------------------------------------------------------------------
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tokens = self._tokens(messages)
+        time.sleep(self.latency + len(tokens) * self._token_delay())
+        message = AIMessage(
+            content="".join(tokens), usage_metadata=self._usage(messages, tokens)
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tokens = self._tokens(messages)
+        await asyncio.sleep(self.latency + len(tokens) * self._token_delay())
+        message = AIMessage(
+            content="".join(tokens), usage_metadata=self._usage(messages, tokens)
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        tokens = self._tokens(messages)
+        time.sleep(self.latency)
+        for token in tokens:
+            time.sleep(self._token_delay())
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(
+                content="", usage_metadata=self._usage(messages, tokens)
+            )
+        )
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        tokens = self._tokens(messages)
+        await asyncio.sleep(self.latency)
+        delay = self._token_delay()
+        for token in tokens:
+            await asyncio.sleep(delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(
+                content="", usage_metadata=self._usage(messages, tokens)
+            )
+        )
+
+
+def install(
+    latency: float = 0.5, tokens_per_second: float = 200.0, answer_tokens: int = 60
+):
+    """Route every get_llm call in the backend to FakeChatModel"""
+    from multi_agent_app.core import agent, helper
+
+    models = {}
+
+    def get_llm(provider: str, model_name: str, streaming: bool, temperature: int):
+        key = (provider, model_name, streaming, temperature)
+        if key not in models:
+            models[key] = FakeChatModel(
+                model_name=model_name,
+                temperature=temperature,
+                streaming=streaming,
+                latency=latency,
+                tokens_per_second=tokens_per_second,
+                answer_tokens=answer_tokens,
+            )
+        return models[key]
+
+    helper.get_llm = get_llm
+    agent.get_llm = get_llm
@@ -0,0 +1,94 @@
+"""
+Import-time benchmark for the backend.
+
+Imports the FastAPI app in fresh interpreters and reports the wall time,
+the slowest modules (from python -X importtime), and which heavy
+dependencies were pulled in at import. Those should only load during
+warm-up, so the list is expected to be empty.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --runs 10 --json
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+MODULE = "multi_agent_app.backend.api"
+
+# Loaded lazily by the app; importing any of these at startup is a regression
+HEAVY_MODULES = [
+    "torch",
+    "sentence_transformers",
+    "langchain_groq",
+    "langchain_openai",
+    "langgraph.prebuilt",
+]
+
+
+def run_once(module: str):
+    """Import module in a new interpreter; returns (seconds, importtime rows)"""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - started
+
+    if proc.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((name.strip(), int(cumulative_us)))
+
+    return elapsed, rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default=MODULE)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="print a JSON report")
+    args = parser.parse_args(argv)
+
+    timings = []
+    rows = []
+    for _ in range(args.runs):
+        elapsed, rows = run_once(args.module)
+        timings.append(elapsed)
+
+    imported = {name for name, _ in rows}
+    slowest = sorted(rows, key=lambda row: row[1], reverse=True)[: args.top]
+
+    report = {
+        "module": args.module,
+        "runs": args.runs,
+        "median_seconds": statistics.median(timings),
+        "min_seconds": min(timings),
+        "max_seconds": max(timings),
+        "heavy_modules_imported": [m for m in HEAVY_MODULES if m in imported],
+        "slowest_modules_ms": {name: us / 1000 for name, us in slowest},
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{args.module}: median {report['median_seconds']:.2f}s over {args.runs} runs")
+    print(f"heavy modules imported: {report['heavy_modules_imported'] or 'none'}")
+    print("slowest modules (cumulative ms):")
+    for name, ms in report["slowest_modules_ms"].items():
+        print(f"  {ms:9.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
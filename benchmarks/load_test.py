@@ -0,0 +1,447 @@
+"""
+Offline load test for the backend.
+
+Runs the FastAPI app under uvicorn in a background thread with the LLM
+replaced by a deterministic fake (benchmarks/fake_llm.py), then replays
+a JSONL corpus against /chat and /chat-stream at a target request rate
+and concurrency. Reports throughput, latency percentiles, time to first
+token, cache hit rates and the event-loop lag of the server loop.
+
+No API keys or network access are needed:
+  - Redis: fakeredis by default, or --redis local for the Redis in
+    REDIS_HOST/REDIS_PORT/REDIS_DB (use a database you can throw away)
+  - web search: the stub backend
+  - embeddings: the model is read from the local Hugging Face cache
+    (HF_HUB_OFFLINE=1), so it must have been downloaded once; with
+    --fake-embeddings a deterministic hashed bag-of-words backend
+    (benchmarks/fake_embeddings.py) is used and nothing is downloaded
+
+    python benchmarks/load_test.py requests.jsonl
+    python benchmarks/load_test.py requests.jsonl --rps 20 --concurrency 32 \\
+        --endpoint mixed --passes 3 --llm-latency 0.8 --json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+# Offline settings, applied before the backend reads its configuration
+OFFLINE_ENV = {
+    "SEARCH_BACKEND": "stub",
+    "SEMANTIC_SNAPSHOT_DIR": "",
+    "CHECKPOINTER_BACKEND": "memory",
+    "HF_HUB_OFFLINE": "1",
+}
+
+CACHE_HITS = ("exact", "semantic", "stale")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("corpus", help="JSONL file: one request per line")
+    parser.add_argument(
+        "--endpoint", choices=["chat", "chat-stream", "mixed"], default="chat"
+    )
+    parser.add_argument(
+        "--rps", type=float, default=10.0, help="arrival rate (0 = unthrottled)"
+    )
+    parser.add_argument("--concurrency", type=int, default=16, help="max in flight")
+    parser.add_argument(
+        "--passes", type=int, default=2, help="corpus replays (repeats hit the cache)"
+    )
+    parser.add_argument("--requests", type=int, help="default: corpus size x passes")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--redis", choices=["fake", "local"], default="fake")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--llm-latency", type=float, default=0.5, help="fake LLM seconds to first token"
+    )
+    parser.add_argument("--llm-tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--llm-answer-tokens", type=int, default=60)
+    parser.add_argument(
+        "--fake-embeddings",
+        action="store_true",
+        help="deterministic embeddings instead of the model (fully offline)",
+    )
+    parser.add_argument("--ready-timeout", type=float, default=300.0)
+    parser.add_argument("--assistant-type", default="General")
+    parser.add_argument("--llm-type", default="Groq")
+    parser.add_argument("--model-name", default="llama-3.1-8b-instant")
+    parser.add_argument("--temperature", type=float, default=0.0)
+    parser.add_argument("--allow-search", action="store_true")
+    parser.add_argument("--json", action="store_true", help="print a JSON report")
+    return parser.parse_args(argv)
+
+
+# ---------------------------------------------------------
+# Server under test
+# ---------------------------------------------------------
+class LoopLagMonitor:
+    """Samples how late the server loop wakes up from a short sleep"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples = []
+
+    async def run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            late = time.perf_counter() - started - self.interval
+            self.samples.append(max(0.0, late))
+
+
+class BackendServer:
+    """The app under uvicorn, on its own event loop in a background thread"""
+
+    def __init__(self, app, port: int):
+        import uvicorn
+
+        self.server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+        )
+        self.lag = LoopLagMonitor()
+        self.thread = threading.Thread(
+            target=lambda: asyncio.run(self._serve()), daemon=True
+        )
+
+    async def _serve(self):
+        monitor = asyncio.create_task(self.lag.run())
+        try:
+            await self.server.serve()
+        finally:
+            monitor.cancel()
+
+    def start(self):
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise SystemExit("Backend failed to start")
+            time.sleep(0.05)
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=30)
+
+
+def check_lua(client):
+    """Single-flight locks are released and renewed with Lua scripts"""
+    try:
+        client.eval("return 1", 0)
+    except Exception as e:
+        raise SystemExit(
+            "fakeredis cannot run Lua scripts, so single-flight locks would "
+            "never be released: pip install 'fakeredis[lua]' "
+            f"(or use --redis local). {e}"
+        )
+
+
+def build_app(args):
+    for name, value in OFFLINE_ENV.items():
+        os.environ.setdefault(name, value)
+
+    if args.redis == "fake":
+        # fakeredis has no vector search: keep the semantic index in memory
+        os.environ["SEMANTIC_CACHE_BACKEND"] = "memory"
+
+    import fake_embeddings
+    import fake_llm
+
+    from multi_agent_app.backend.api import app
+    from multi_agent_app.cache import redis_client
+
+    if args.redis == "fake":
+        import fakeredis
+
+        server = fakeredis.FakeServer()
+        check_lua(fakeredis.FakeRedis(server=server))
+        redis_client._client = fakeredis.FakeAsyncRedis(
+            server=server, decode_responses=True
+        )
+        redis_client._binary_client = fakeredis.FakeAsyncRedis(server=server)
+
+    if args.fake_embeddings:
+        fake_embeddings.install()
+
+    fake_llm.install(
+        latency=args.llm_latency,
+        tokens_per_second=args.llm_tokens_per_second,
+        answer_tokens=args.llm_answer_tokens,
+    )
+    return app
+
+
+# ---------------------------------------------------------
+# Load generation
+# ---------------------------------------------------------
+def build_plan(args) -> list:
+    """(endpoint, payload) for every request, corpus order repeated"""
+    from multi_agent_app.batch_cli import read_items
+
+    items = read_items(args.corpus, args)
+    if not items:
+        raise SystemExit(f"No requests in {args.corpus}")
+
+    total = args.requests or len(items) * args.passes
+    plan = []
+
+    for n in range(total):
+        item = dict(items[n % len(items)])
+        item.update(thread_id=f"load-{n}", enable_memory=False)
+
+        if args.endpoint == "mixed":
+            endpoint = "chat-stream" if n % 2 else "chat"
+        else:
+            endpoint = args.endpoint
+
+        item["streaming"] = endpoint == "chat-stream"
+        plan.append((endpoint, item))
+
+    return plan
+
+
+async def send_chat(client, payload) -> dict:
+    started = time.perf_counter()
+    response = await client.post("/chat", json=payload)
+    latency = time.perf_counter() - started
+
+    if response.status_code != 200:
+        return {"ok": False, "status": response.status_code, "latency": latency}
+
+    return {"ok": True, "latency": latency, "cache": response.json().get("cache")}
+
+
+async def send_stream(client, payload) -> dict:
+    started = time.perf_counter()
+    result = {"ok": False, "ttft": None, "cache": None}
+
+    async with client.stream("POST", "/chat-stream", json=payload) as response:
+        result["status"] = response.status_code
+
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            event = json.loads(line)
+
+            if event["type"] == "cache":
+                result["cache"] = event["cache"]
+            elif event["type"] == "token" and result["ttft"] is None:
+                result["ttft"] = time.perf_counter() - started
+            elif event["type"] == "done":
+                result["ok"] = True
+            elif event["type"] == "error":
+                break
+
+    result["latency"] = time.perf_counter() - started
+    return result
+
+
+async def run_load(base_url: str, plan: list, rps: float, concurrency: int):
+    import httpx
+
+    slots = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+
+    async def one(endpoint, payload):
+        try:
+            send = send_stream if endpoint == "chat-stream" else send_chat
+            result = await send(client, payload)
+        except httpx.HTTPError as e:
+            result = {"ok": False, "error": type(e).__name__, "latency": None}
+        finally:
+            slots.release()
+
+        result["endpoint"] = endpoint
+        return result
+
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=300, limits=limits
+    ) as client:
+        tasks = []
+        started = time.perf_counter()
+
+        for n, (endpoint, payload) in enumerate(plan):
+            # open-loop arrivals at the target rate, held back only when
+            # `concurrency` requests are already in flight
+            if rps > 0:
+                delay = started + n / rps - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            await slots.acquire()
+            tasks.append(asyncio.create_task(one(endpoint, payload)))
+
+        results = await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    return results, elapsed
+
+
+async def wait_until_ready(base_url: str, timeout: float):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    checks = {}
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=5) as client:
+        while time.monotonic() < deadline:
+            response = await client.get("/readyz")
+            if response.status_code == 200:
+                return
+            checks = response.json()
+            if checks.get("error"):
+                break
+            await asyncio.sleep(0.5)
+
+    raise SystemExit(f"Backend not ready: {checks}")
+
+
+# ---------------------------------------------------------
+# Report
+# ---------------------------------------------------------
+def percentile(values: list, p: float):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def summarize(values: list, scale: float = 1000.0) -> dict:
+    """p50/p95/p99/max, in milliseconds by default"""
+    return {
+        name: (round(value * scale, 2) if value is not None else None)
+        for name, value in (
+            ("p50", percentile(values, 50)),
+            ("p95", percentile(values, 95)),
+            ("p99", percentile(values, 99)),
+            ("max", max(values) if values else None),
+        )
+    }
+
+
+def endpoint_report(results: list, elapsed: float) -> dict:
+    ok = [r for r in results if r["ok"]]
+    outcomes = {}
+    for r in ok:
+        outcomes[r["cache"]] = outcomes.get(r["cache"], 0) + 1
+
+    hits = sum(outcomes.get(kind, 0) for kind in CACHE_HITS)
+
+    report = {
+        "requests": len(results),
+        "errors": len(results) - len(ok),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else None,
+        "latency_ms": summarize([r["latency"] for r in ok]),
+        "cache_outcomes": outcomes,
+        "cache_hit_rate": round(hits / len(ok), 3) if ok else None,
+    }
+
+    ttft = [r["ttft"] for r in ok if r.get("ttft") is not None]
+    if ttft:
+        report["ttft_ms"] = summarize(ttft)
+
+    return report
+
+
+def build_report(args, results: list, elapsed: float, lag_samples: list) -> dict:
+    report = {
+        "config": {
+            "corpus": args.corpus,
+            "endpoint": args.endpoint,
+            "target_rps": args.rps,
+            "concurrency": args.concurrency,
+            "cache": not args.no_cache,
+            "redis": args.redis,
+            "embeddings": "fake" if args.fake_embeddings else "model",
+            "llm_latency_s": args.llm_latency,
+            "llm_tokens_per_second": args.llm_tokens_per_second,
+        },
+        "duration_s": round(elapsed, 2),
+        "achieved_rps": round(len(results) / elapsed, 2) if elapsed else None,
+        "overall": endpoint_report(results, elapsed),
+        "event_loop_lag_ms": summarize(lag_samples),
+    }
+
+    for endpoint in ("chat", "chat-stream"):
+        subset = [r for r in results if r["endpoint"] == endpoint]
+        if subset and args.endpoint == "mixed":
+            report[endpoint] = endpoint_report(subset, elapsed)
+
+    return report
+
+
+def format_summary(summary: dict) -> str:
+    return "  ".join(f"{name} {value}" for name, value in summary.items())
+
+
+def print_report(report: dict):
+    config = report["config"]
+    print(
+        f"{config['endpoint']} at {config['target_rps']} rps target, "
+        f"concurrency {config['concurrency']}, "
+        f"cache {'on' if config['cache'] else 'off'}, "
+        f"fake LLM {config['llm_latency_s']}s + "
+        f"{config['llm_tokens_per_second']} tok/s, "
+        f"{config['embeddings']} embeddings"
+    )
+    print(f"duration {report['duration_s']}s, achieved {report['achieved_rps']} rps")
+
+    for name in ("overall", "chat", "chat-stream"):
+        section = report.get(name)
+        if not section:
+            continue
+        print(
+            f"\n[{name}] {section['requests']} requests, "
+            f"{section['errors']} errors, {section['throughput_rps']} ok/s"
+        )
+        print(f"  latency ms  {format_summary(section['latency_ms'])}")
+        if "ttft_ms" in section:
+            print(f"  ttft ms     {format_summary(section['ttft_ms'])}")
+        print(
+            f"  cache hit rate {section['cache_hit_rate']}  {section['cache_outcomes']}"
+        )
+
+    print(f"\nevent loop lag ms  {format_summary(report['event_loop_lag_ms'])}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    plan = build_plan(args)
+
+    server = BackendServer(build_app(args), args.port)
+    server.start()
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        asyncio.run(wait_until_ready(base_url, args.ready_timeout))
+
+        # only lag under load is reported
+        server.lag.samples.clear()
+        results, elapsed = asyncio.run(
+            run_load(base_url, plan, args.rps, args.concurrency)
+        )
+        lag_samples = list(server.lag.samples)
+
+    finally:
+        server.stop()
+
+    report = build_report(args, results, elapsed, lag_samples)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,103 @@
+import asyncio
+import json
 import time
-from fastapi import FastAPI, HTTPException
+import uuid
+from contextlib import asynccontextmanager
+from typing import Optional
+import anyio
+from fastapi import BackgroundTasks, FastAPI, HTTPException
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
 # Import order matches code creation order
 # Logging and custom exception handling utilities
 from multi_agent_app.common.logger import get_logger
 from multi_agent_app.common.custom_exception import CustomException
+from multi_agent_app.common.timing import StreamRecorder, stage, start_timer
 
 # Application configuration (allowed models, assistants, temperature values)
 from multi_agent_app.config.settings import settings
 
+# Lazy model loading: warm-up and readiness checks
+from multi_agent_app.backend.readiness import readiness, warm_up
+
 # Core AI agent responsible for generating responses
 from multi_agent_app.core.agent import generate_response
+from multi_agent_app.core.response_parser import StreamingResponseParser
+from multi_agent_app.core.memory import (
+    close_checkpointer,
+    init_checkpointer,
+    run_memory_service,
+)
+from multi_agent_app.core.search import close_search_client
+from multi_agent_app.core.usage import record_tokens_avoided
 
 # Backend caching system (exact cache + semantic cache)
-from multi_agent_app.cache.cache_manager import check_cache, store_all
+from multi_agent_app.cache.cache_manager import (
+    check_cache,
+    check_cache_many,
+    store_all,
+)
+from multi_agent_app.cache.semantic_snapshot import run_snapshot_service
+from multi_agent_app.cache.exact_cache import make_key
+from multi_agent_app.cache.single_flight import (
+    SingleFlight,
+    StreamSingleFlight,
+    try_lock,
+)
 
 # Observability stack
 # Prometheus collects metrics and Grafana visualizes them
 from prometheus_fastapi_instrumentator import Instrumentator
-from prometheus_client import Counter, Histogram
+from multi_agent_app.common.metrics import (
+    BATCH_ITEM_LATENCY,
+    CACHE_HITS,
+    COALESCED_REQUESTS,
+    ERROR_COUNT,
+    REQUEST_COUNT,
+    REQUEST_LATENCY,
+)
 
 logger = get_logger(__name__)
 
+# ---------------------------------------------------------
+# Application lifespan
+# ---------------------------------------------------------
+# Background services that live as long as the server:
+# - semantic cache snapshots (warm start on boot, periodic
+#   saves, final save on shutdown)
+# - conversational memory (checkpointer opened before the
+#   first request, expired threads pruned periodically)
+# - warm-up (models loaded in the background; the server
+#   accepts connections at once and /readyz turns ready
+#   when it is done)
+# ---------------------------------------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+
+    await init_checkpointer()
+
+    warm_up_task = asyncio.create_task(warm_up())
+    snapshot_task = asyncio.create_task(run_snapshot_service())
+    memory_task = asyncio.create_task(run_memory_service())
+
+    yield
+
+    warm_up_task.cancel()
+    snapshot_task.cancel()
+    memory_task.cancel()
+    await asyncio.gather(
+        warm_up_task, snapshot_task, memory_task, return_exceptions=True
+    )
+
+    await close_checkpointer()
+    await close_search_client()
+
+
 # ---------------------------------------------------------
 # FastAPI application instance
 # ---------------------------------------------------------
-app = FastAPI(title="MULTI AI AGENT")
+app = FastAPI(title="MULTI AI AGENT", lifespan=lifespan)
 
 # ---------------------------------------------------------
 # Enable Prometheus metrics endpoint
@@ -46,36 +117,27 @@ Instrumentator().instrument(app).expose(app)
 
 
 # ---------------------------------------------------------
-# Custom metrics used for Grafana dashboards
+# Health checks
 # ---------------------------------------------------------
+# /healthz: the process is up and serving (liveness)
+# /readyz:  models are warmed and Redis is reachable, so
+#           the instance can take traffic (readiness)
+# ---------------------------------------------------------
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
 
-# Total number of requests processed by the backend
-# Labels allow grouping by assistant type and model
-REQUEST_COUNT = Counter(
-    "ai_agent_requests_total",
-    "Total requests",
-    ["assistant", "model"],
-)
 
-# Total cache hits (exact cache or semantic cache)
-CACHE_HITS = Counter(
-    "ai_agent_cache_hits_total",
-    "Cache hits",
-    ["type"],
-)
+@app.get("/readyz")
+async def readyz():
 
-# Histogram measuring response latency of AI requests
-# Prometheus automatically creates latency buckets
-REQUEST_LATENCY = Histogram(
-    "ai_agent_latency_seconds",
-    "Latency of AI responses",
-)
+    checks = await readiness()
+    ready = checks["models"] and checks["redis"]
 
-# Total number of backend errors
-ERROR_COUNT = Counter(
-    "ai_agent_errors_total",
-    "Total errors",
-)
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not ready", **checks},
+    )
 
 
 # ---------------------------------------------------------
@@ -102,11 +164,294 @@ class RequestState(BaseModel):
     enable_cache: bool = True
 
 
+# ---------------------------------------------------------
+# NDJSON framing for streaming responses
+# ---------------------------------------------------------
+# Each event is written as one JSON object per line, e.g.
+#   {"type": "cache", "cache": "exact" | "semantic" | "miss"}
+#   {"type": "token", "content": "..."}
+#   {"type": "tool_start", "name": "...", "input": {...}}
+#   {"type": "suggestions", "suggestions": [...]}
+#   {"type": "done"}
+# Errors raised mid-stream cannot change the HTTP status any more,
+# so they are reported as a final {"type": "error"} event.
+# ---------------------------------------------------------
+def encode_event(event: dict) -> bytes:
+    return (json.dumps(event, default=str) + "\n").encode("utf-8")
+
+
+async def ndjson_stream(events, recorder: Optional[StreamRecorder] = None):
+
+    def frame(event):
+        data = encode_event(event)
+        if recorder is not None:
+            recorder.sent(event, data)
+        return data
+
+    # False until the last event has been handed to the client
+    completed = False
+
+    try:
+
+        async for event in events:
+            yield frame(event)
+
+        yield frame({"type": "done"})
+        completed = True
+
+    except Exception as e:
+
+        ERROR_COUNT.inc()
+
+        logger.error(f"Streaming error: {str(e)}")
+
+        yield frame({"type": "error", "detail": "Failed to get AI response"})
+        completed = True
+
+    finally:
+
+        if recorder is not None:
+            recorder.close(completed)
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for ndjson_stream generators.
+
+    The generator is closed as soon as sending stops, so a client that
+    disconnected mid-stream is recorded right away (and the work behind
+    the stream released) instead of whenever the generator is collected.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def stream_response(self, send):
+        try:
+            await super().stream_response(send)
+        finally:
+            with anyio.CancelScope(shield=True):
+                await self.body_iterator.aclose()
+
+
+# ---------------------------------------------------------
+# Cache write used by both endpoints
+# Runs after the answer has been delivered, so classifying the
+# query for its TTL and writing both tiers adds no user latency
+# ---------------------------------------------------------
+async def store_response(
+    query, answer, cache_config, allow_search, lookup, suggestions=None, usage=None
+):
+
+    try:
+
+        category = await store_all(
+            query,
+            answer,
+            cache_config,
+            allow_search,
+            lookup=lookup,
+            suggestions=suggestions,
+            usage=usage,
+        )
+
+        logger.info(f"Stored response in cache (category: {category})")
+
+    except Exception as cache_err:
+
+        ERROR_COUNT.inc()
+        logger.error(f"Cache store failed: {str(cache_err)}")
+
+
+# Stores started by streams (which have no BackgroundTasks once the
+# body is being sent); referenced here until they finish
+_pending_stores = set()
+
+
+def store_in_background(*args):
+    """Run store_response in its own task, without delaying the caller"""
+
+    task = asyncio.create_task(store_response(*args))
+    _pending_stores.add(task)
+    task.add_done_callback(_pending_stores.discard)
+
+
+# ---------------------------------------------------------
+# Stale-while-revalidate refresh
+# ---------------------------------------------------------
+# A "stale" exact hit is served immediately; this background
+# task then regenerates the answer and re-stores it. The local
+# set and the Redis lock ensure a single refresh per key across
+# all requests and workers.
+# ---------------------------------------------------------
+_refreshing = set()
+
+
+async def refresh_stale(request, query, cache_config, lookup):
+
+    key = make_key(query, cache_config)
+
+    if key in _refreshing:
+        return
+
+    _refreshing.add(key)
+
+    lock = None
+
+    try:
+
+        lock = await try_lock("refresh", key)
+
+        if lock is None:
+            return
+
+        result = await generate_response(
+            request.assistant_type,
+            request.llm_type,
+            request.model_name,
+            request.temperature,
+            query,
+            request.allow_search,
+            False,
+            request.thread_id,
+            False,  # refresh the shared answer, not a conversation
+        )
+
+        await store_response(
+            query,
+            result["answer"],
+            cache_config,
+            request.allow_search,
+            lookup,
+            result["suggestions"],
+            result["usage"],
+        )
+
+        logger.info(f"Refreshed stale cache entry for query: {query[:60]}")
+
+    except Exception as e:
+
+        ERROR_COUNT.inc()
+        logger.error(f"Stale refresh failed: {str(e)}")
+
+    finally:
+
+        _refreshing.discard(key)
+
+        if lock is not None:
+            await lock.release()
+
+
+# Characters per token event when replaying a cached answer
+REPLAY_CHUNK_SIZE = 64
+
+
+async def replay_cached(answer: str, cache_type: str, suggestions=None):
+    """Serve a cached answer through the streaming protocol"""
+
+    yield {"type": "cache", "cache": cache_type}
+
+    for i in range(0, len(answer), REPLAY_CHUNK_SIZE):
+        yield {"type": "token", "content": answer[i : i + REPLAY_CHUNK_SIZE]}
+        # let other requests run between chunks of long answers
+        await asyncio.sleep(0)
+
+    yield {"type": "suggestions", "suggestions": suggestions or []}
+
+
+async def parse_and_store(events, request, query, cache_config, lookup):
+    """
+    Forward live agent events to the client while parsing the
+    ANSWER/SUGGESTIONS format, then cache the full answer.
+    """
+
+    parser = StreamingResponseParser()
+    usage = None
+
+    yield {"type": "cache", "cache": "miss"}
+
+    async for event in events:
+
+        if event["type"] == "token":
+            text = parser.feed(event["content"])
+            if text:
+                yield {"type": "token", "content": text}
+        elif event["type"] == "usage":
+            # kept with the cache entry, not sent to the client
+            usage = event["usage"]
+        else:
+            yield event
+
+    tail = parser.finish()
+    if tail:
+        yield {"type": "token", "content": tail}
+
+    # Store the captured answer in the background, so the final events
+    # (and "done") are not held up by the cache write
+    if request.enable_cache and parser.answer:
+        store_in_background(
+            query,
+            parser.answer,
+            cache_config,
+            request.allow_search,
+            lookup,
+            parser.suggestions,
+            usage,
+        )
+
+    yield {"type": "suggestions", "suggestions": parser.suggestions}
+
+
+# ---------------------------------------------------------
+# Single-flight coalescing
+# ---------------------------------------------------------
+# Identical prompts (same make_key hash as the exact cache) that
+# arrive while the first one is still running share its answer.
+# Memory-enabled requests are never coalesced: their answers
+# depend on each conversation's history.
+# ---------------------------------------------------------
+chat_flights = SingleFlight("chat")
+stream_flights = StreamSingleFlight(
+    "chat-stream",
+    lambda answer, suggestions: replay_cached(answer, "coalesced", suggestions),
+)
+
+
+def can_coalesce(request: RequestState) -> bool:
+    return request.enable_cache and not request.enable_memory
+
+
+async def as_coalesced(events):
+    """Relabel a shared stream for a follower"""
+    async for event in events:
+        if event["type"] == "cache":
+            event = {"type": "cache", "cache": "coalesced"}
+        yield event
+
+
+def server_timing_headers(timer) -> dict:
+    """Server-Timing header for a response, if enabled"""
+    if not settings.SERVER_TIMING_HEADER:
+        return {}
+    return {"Server-Timing": timer.server_timing()}
+
+
+def miss_outcome(request: RequestState, shared: bool) -> str:
+    """Cache label for a request answered by the LLM"""
+    if shared:
+        return "coalesced"
+    return "miss" if request.enable_cache else "disabled"
+
+
 # ---------------------------------------------------------
 # MAIN CHAT ENDPOINT (non-streaming responses)
 # ---------------------------------------------------------
 @app.post("/chat")
-async def chat_endpoint(request: RequestState):
+async def chat_endpoint(
+    request: RequestState, background_tasks: BackgroundTasks, response: Response
+):
+
+    # Per-stage timings (monotonic clock) for metrics and Server-Timing
+    timer = start_timer()
 
     logger.info(f"Assistant type: {request.assistant_type}")
 
@@ -145,6 +490,8 @@ async def chat_endpoint(request: RequestState):
     if request.temperature not in settings.ALLOWED_TEMPERATURE_VALUES:
         raise HTTPException(status_code=400, detail="Invalid temperature value")
 
+    timer.add("validate", timer.elapsed())
+
     # ---------------------------------------------------------
     # METRIC: count incoming requests
     # Used by Grafana to show traffic per assistant/model
@@ -156,9 +503,6 @@ async def chat_endpoint(request: RequestState):
 
     try:
 
-        # Start latency timer for this request
-        start_time = time.time()
-
         # ---------------------------------------------------------
         # Combine user messages into a single query string
         # ---------------------------------------------------------
@@ -185,9 +529,12 @@ async def chat_endpoint(request: RequestState):
         # If a cached response exists we return immediately
         # without invoking the LLM.
         # ---------------------------------------------------------
+        # Cache context (holds the query embedding) reused when storing
+        lookup = None
+
         if request.enable_cache:
 
-            cached_response, cache_type = check_cache(
+            cached_response, cache_type, lookup = await check_cache(
                 query,
                 cache_config,
                 request.allow_search,
@@ -197,61 +544,92 @@ async def chat_endpoint(request: RequestState):
 
                 # Record cache hit metric
                 CACHE_HITS.labels(type=cache_type).inc()
+                record_tokens_avoided(
+                    request.assistant_type,
+                    request.model_name,
+                    cache_type,
+                    cached_response,
+                )
 
                 # Record latency for cached responses
-                REQUEST_LATENCY.observe(time.time() - start_time)
+                REQUEST_LATENCY.observe(
+                    timer.finish(request.assistant_type, request.model_name, cache_type)
+                )
+                response.headers.update(server_timing_headers(timer))
 
                 logger.info(f"Cache hit ({cache_type}) for query: {query[:60]}")
 
+                if cache_type == "stale":
+                    background_tasks.add_task(
+                        refresh_stale, request, query, cache_config, lookup
+                    )
+
                 return {
-                    "response": cached_response,
-                    "suggestions": [],
+                    "response": cached_response["answer"],
+                    "suggestions": cached_response.get("suggestions", []),
                     "cache": cache_type,
                 }
 
         # ---------------------------------------------------------
         # Generate response using the AI agent
         # ---------------------------------------------------------
-        result = await generate_response(
-            request.assistant_type,
-            request.llm_type,
-            request.model_name,
-            request.temperature,
-            query,
-            request.allow_search,
-            False,  # never streams here
-            request.thread_id,
-            request.enable_memory,
-        )
-
-        # ---------------------------------------------------------
-        # STORE RESPONSE IN CACHE
-        # ---------------------------------------------------------
-        if request.enable_cache and result and result != "Error":
+        async def run_agent():
+            return await generate_response(
+                request.assistant_type,
+                request.llm_type,
+                request.model_name,
+                request.temperature,
+                query,
+                request.allow_search,
+                False,  # never streams here
+                request.thread_id,
+                request.enable_memory,
+            )
 
-            try:
+        shared = False
 
-                store_all(
-                    query,
-                    result["answer"],
-                    cache_config,
-                    request.allow_search,
-                )
+        if can_coalesce(request):
+            result, shared = await chat_flights.do(
+                make_key(query, cache_config), run_agent
+            )
+        else:
+            result = await run_agent()
 
-                logger.info("Stored response in cache")
+        if shared:
+            COALESCED_REQUESTS.labels(endpoint="chat").inc()
 
-            except Exception as cache_err:
+        # ---------------------------------------------------------
+        # STORE RESPONSE IN CACHE
+        # Scheduled to run after the response has been sent
+        # (only by the request that actually called the LLM)
+        # ---------------------------------------------------------
+        if request.enable_cache and result and result != "Error" and not shared:
 
-                ERROR_COUNT.inc()
-                logger.error(f"Cache store failed: {str(cache_err)}")
+            background_tasks.add_task(
+                store_response,
+                query,
+                result["answer"],
+                cache_config,
+                request.allow_search,
+                lookup,
+                result["suggestions"],
+                result["usage"],
+            )
 
         # Record total request latency
-        REQUEST_LATENCY.observe(time.time() - start_time)
+        REQUEST_LATENCY.observe(
+            timer.finish(
+                request.assistant_type,
+                request.model_name,
+                miss_outcome(request, shared),
+            )
+        )
+        response.headers.update(server_timing_headers(timer))
 
         return {
             "response": result["answer"],
             "suggestions": result["suggestions"],
-            "cache": "miss",
+            "cache": "coalesced" if shared else "miss",
         }
 
     except Exception as e:
@@ -276,7 +654,11 @@ async def chat_endpoint(request: RequestState):
 # Handles token streaming responses from the LLM
 # ---------------------------------------------------------
 @app.post("/chat-stream")
-async def chat_stream_endpoint(request: RequestState):
+async def chat_stream_endpoint(
+    request: RequestState, background_tasks: BackgroundTasks
+):
+
+    timer = start_timer()
 
     logger.info(f"Assistant type: {request.assistant_type}")
 
@@ -299,6 +681,8 @@ async def chat_stream_endpoint(request: RequestState):
     ):
         raise HTTPException(status_code=400, detail="Invalid model name")
 
+    timer.add("validate", timer.elapsed())
+
     # Count streaming requests as well
     REQUEST_COUNT.labels(
         assistant=request.assistant_type,
@@ -307,28 +691,118 @@ async def chat_stream_endpoint(request: RequestState):
 
     try:
 
-        start_time = time.time()
-
         # Combine messages into a single query
         query = "\n".join(request.messages)
 
-        # Generate streaming response
-        response = await generate_response(
-            request.assistant_type,
-            request.llm_type,
-            request.model_name,
-            request.temperature,
-            query,
-            request.allow_search,
-            True,  # force streaming
-            request.thread_id,
-            request.enable_memory,
-        )
+        # Same cache isolation as the non-streaming endpoint
+        cache_config = {
+            "model_name": request.model_name,
+            "temperature": request.temperature,
+            "assistant_type": request.assistant_type,
+            "llm_type": request.llm_type,
+        }
 
-        # Record latency of streaming request
-        REQUEST_LATENCY.observe(time.time() - start_time)
+        lookup = None
 
-        return response
+        # ---------------------------------------------------------
+        # BACKEND CACHE CHECK
+        # Cached answers are replayed as a fast chunked stream
+        # ---------------------------------------------------------
+        if request.enable_cache:
+
+            cached_response, cache_type, lookup = await check_cache(
+                query,
+                cache_config,
+                request.allow_search,
+            )
+
+            if cached_response:
+
+                CACHE_HITS.labels(type=cache_type).inc()
+                record_tokens_avoided(
+                    request.assistant_type,
+                    request.model_name,
+                    cache_type,
+                    cached_response,
+                )
+
+                REQUEST_LATENCY.observe(
+                    timer.finish(request.assistant_type, request.model_name, cache_type)
+                )
+
+                logger.info(f"Cache hit ({cache_type}) for query: {query[:60]}")
+
+                if cache_type == "stale":
+                    background_tasks.add_task(
+                        refresh_stale, request, query, cache_config, lookup
+                    )
+
+                return NDJSONStreamingResponse(
+                    ndjson_stream(
+                        replay_cached(
+                            cached_response["answer"],
+                            cache_type,
+                            cached_response.get("suggestions"),
+                        ),
+                        StreamRecorder(
+                            timer.started,
+                            request.assistant_type,
+                            request.model_name,
+                            cache_type,
+                        ),
+                    ),
+                    headers=server_timing_headers(timer),
+                )
+
+        # Generate streaming response (async generator of agent events)
+        async def start_stream():
+            events = await generate_response(
+                request.assistant_type,
+                request.llm_type,
+                request.model_name,
+                request.temperature,
+                query,
+                request.allow_search,
+                True,  # force streaming
+                request.thread_id,
+                request.enable_memory,
+            )
+            return parse_and_store(events, request, query, cache_config, lookup)
+
+        shared = False
+
+        # time until the stream is ready; tokens are measured as they flow
+        with stage("stream_setup"):
+            if can_coalesce(request):
+                stream, shared = await stream_flights.subscribe(
+                    make_key(query, cache_config), start_stream
+                )
+                if shared:
+                    COALESCED_REQUESTS.labels(endpoint="chat-stream").inc()
+                    stream = as_coalesced(stream)
+            else:
+                stream = await start_stream()
+
+        cache_outcome = miss_outcome(request, shared)
+
+        # Record latency until the stream starts; what the client
+        # sees afterwards is measured by the StreamRecorder
+        REQUEST_LATENCY.observe(
+            timer.finish(request.assistant_type, request.model_name, cache_outcome)
+        )
+
+        return NDJSONStreamingResponse(
+            ndjson_stream(
+                stream,
+                StreamRecorder(
+                    timer.started,
+                    request.assistant_type,
+                    request.model_name,
+                    cache_outcome,
+                ),
+            ),
+            headers=server_timing_headers(timer),
+        )
 
     except Exception as e:
 
@@ -345,3 +819,251 @@ async def chat_stream_endpoint(request: RequestState):
                 )
             ),
         )
+
+
+# ---------------------------------------------------------
+# BATCH CHAT ENDPOINT
+# ---------------------------------------------------------
+# Many requests in one call (nightly question sets, offline
+# evaluation). Cache hits are resolved in bulk, the remaining
+# LLM calls run concurrently (bounded per provider) and each
+# result is streamed back as one NDJSON line as soon as it is
+# ready, so lines arrive in completion order:
+#   {"type": "result", "index": 0, "id": "...", "response": "...",
+#    "suggestions": [...], "cache": "exact" | ... | "miss"}
+#   {"type": "result", "index": 3, "id": "...", "error": "..."}
+#   {"type": "done"}
+# ---------------------------------------------------------
+class BatchItem(RequestState):
+
+    # Echoed back so results can be matched to inputs
+    id: Optional[str] = None
+
+    # Batch answers are never streamed token by token
+    streaming: bool = False
+
+    # Default: a new conversation per item (see run_batch)
+    thread_id: Optional[str] = None
+
+
+class BatchRequest(BaseModel):
+
+    items: list[BatchItem]
+
+
+# Per-provider limits on concurrent LLM calls, shared by all batches
+_provider_slots: dict[str, asyncio.Semaphore] = {}
+
+
+def provider_slots(llm_type: str) -> asyncio.Semaphore:
+
+    slots = _provider_slots.get(llm_type)
+
+    if slots is None:
+        slots = asyncio.Semaphore(settings.BATCH_PROVIDER_CONCURRENCY.get(llm_type, 1))
+        _provider_slots[llm_type] = slots
+
+    return slots
+
+
+def validation_error(request: RequestState) -> Optional[str]:
+    """Same checks as /chat, returned instead of raised"""
+
+    if request.assistant_type not in settings.ASSISTANT_TYPES:
+        return "Invalid assistant type"
+
+    if request.llm_type not in settings.ALLOWED_LLM_TYPES:
+        return "Invalid llm type"
+
+    if (
+        request.model_name not in settings.ALLOWED_GROQ_MODEL_NAMES
+        and request.model_name not in settings.ALLOWED_OPENAI_MODEL_NAMES
+    ):
+        return "Invalid model name"
+
+    if request.temperature not in settings.ALLOWED_TEMPERATURE_VALUES:
+        return "Invalid temperature value"
+
+    return None
+
+
+async def run_batch(items: list[BatchItem], background_tasks: BackgroundTasks):
+
+    start_time = time.perf_counter()
+
+    queries = ["\n".join(item.messages) for item in items]
+    configs = [
+        {
+            "model_name": item.model_name,
+            "temperature": item.temperature,
+            "assistant_type": item.assistant_type,
+            "llm_type": item.llm_type,
+        }
+        for item in items
+    ]
+
+    def result(i, **fields):
+        return {"type": "result", "index": i, "id": items[i].id, **fields}
+
+    # Items with memory but no thread of their own must not share one
+    for item in items:
+        if item.thread_id is None:
+            item.thread_id = f"batch-{uuid.uuid4().hex}"
+
+    # Invalid items fail on their own, the rest of the batch still runs
+    valid = []
+
+    for i, item in enumerate(items):
+
+        error = validation_error(item)
+
+        if error:
+            yield result(i, error=error)
+            continue
+
+        REQUEST_COUNT.labels(
+            assistant=item.assistant_type,
+            model=item.model_name,
+        ).inc()
+        valid.append(i)
+
+    # ---------------------------------------------------------
+    # Bulk cache check: one MGET for exact hits, one embedding
+    # batch for every remaining query
+    # ---------------------------------------------------------
+    lookups = {}
+    answered = set()
+    cacheable = [i for i in valid if items[i].enable_cache]
+
+    if cacheable:
+
+        found = await check_cache_many(
+            [(queries[i], configs[i], items[i].allow_search) for i in cacheable]
+        )
+
+        for i, (cached_response, cache_type, lookup) in zip(cacheable, found):
+
+            lookups[i] = lookup
+
+            if not cached_response:
+                continue
+
+            CACHE_HITS.labels(type=cache_type).inc()
+            record_tokens_avoided(
+                items[i].assistant_type, items[i].model_name, cache_type, cached_response
+            )
+            BATCH_ITEM_LATENCY.labels(cache=cache_type).observe(
+                time.perf_counter() - start_time
+            )
+
+            if cache_type == "stale":
+                background_tasks.add_task(
+                    refresh_stale, items[i], queries[i], configs[i], lookup
+                )
+
+            answered.add(i)
+            yield result(
+                i,
+                response=cached_response["answer"],
+                suggestions=cached_response.get("suggestions", []),
+                cache=cache_type,
+            )
+
+    # ---------------------------------------------------------
+    # LLM calls for the misses, results in completion order
+    # ---------------------------------------------------------
+    async def answer(i):
+
+        item = items[i]
+        item_start = time.perf_counter()
+
+        async def run_agent():
+            async with provider_slots(item.llm_type):
+                return await generate_response(
+                    item.assistant_type,
+                    item.llm_type,
+                    item.model_name,
+                    item.temperature,
+                    queries[i],
+                    item.allow_search,
+                    False,
+                    item.thread_id,
+                    item.enable_memory,
+                )
+
+        try:
+
+            shared = False
+
+            # identical items in the batch share one LLM call
+            if can_coalesce(item):
+                reply, shared = await chat_flights.do(
+                    make_key(queries[i], configs[i]), run_agent
+                )
+            else:
+                reply = await run_agent()
+
+            if shared:
+                COALESCED_REQUESTS.labels(endpoint="chat-batch").inc()
+
+            elif item.enable_cache:
+                background_tasks.add_task(
+                    store_response,
+                    queries[i],
+                    reply["answer"],
+                    configs[i],
+                    item.allow_search,
+                    lookups.get(i),
+                    reply["suggestions"],
+                    reply["usage"],
+                )
+
+            BATCH_ITEM_LATENCY.labels(cache="coalesced" if shared else "miss").observe(
+                time.perf_counter() - item_start
+            )
+
+            return result(
+                i,
+                response=reply["answer"],
+                suggestions=reply["suggestions"],
+                cache="coalesced" if shared else "miss",
+            )
+
+        except Exception as e:
+
+            ERROR_COUNT.inc()
+
+            logger.error(f"Batch item {i} failed: {str(e)}")
+
+            return result(i, error="Failed to get AI response")
+
+    tasks = [asyncio.create_task(answer(i)) for i in valid if i not in answered]
+
+    try:
+
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+
+    finally:
+
+        # client went away: stop the calls nobody will read. Coalesced
+        # calls run in their own task (SingleFlight), so this only stops
+        # waiting on them; other requests sharing a flight still get it.
+        for task in tasks:
+            task.cancel()
+
+
+@app.post("/chat/batch")
+async def chat_batch_endpoint(batch: BatchRequest, background_tasks: BackgroundTasks):
+
+    logger.info(f"Batch of {len(batch.items)} requests")
+
+    if len(batch.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch exceeds {settings.BATCH_MAX_ITEMS} items",
+        )
+
+    return NDJSONStreamingResponse(
+        ndjson_stream(run_batch(batch.items, background_tasks)),
+    )
@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+from redis.exceptions import RedisError
+
+from multi_agent_app.cache.embeddings import warm_up_embeddings
+from multi_agent_app.cache.query_classifier import load_centroids
+from multi_agent_app.cache.redis_client import get_redis
+from multi_agent_app.common.logger import get_logger
+from multi_agent_app.core.helper import preload_agent_stack
+
+logger = get_logger(__name__)
+
+# ----------------------------
+# Warm-up and readiness
+# ----------------------------
+# Heavy objects (embedding model, classifier centroids, LLM SDKs and
+# LangGraph) are loaded lazily, so importing the app is fast. warm_up()
+# runs from the FastAPI lifespan in the background and loads them before
+# traffic needs them; /readyz reports ready once it has finished and
+# Redis answers.
+
+# Longest time /readyz waits for Redis to answer a PING
+REDIS_PING_TIMEOUT = 1.0
+
+_warm = False
+_warm_up_error = None
+
+
+async def warm_up():
+    global _warm, _warm_up_error
+
+    started = time.monotonic()
+
+    try:
+        await warm_up_embeddings()
+        await asyncio.to_thread(load_centroids)
+        await asyncio.to_thread(preload_agent_stack)
+
+    except Exception as e:
+        _warm_up_error = str(e)
+        logger.error(f"Warm-up failed: {str(e)}")
+        return
+
+    _warm = True
+    logger.info(f"Warm-up finished in {time.monotonic() - started:.2f}s")
+
+
+async def redis_reachable() -> bool:
+    try:
+        return bool(
+            await asyncio.wait_for(get_redis().ping(), timeout=REDIS_PING_TIMEOUT)
+        )
+    except (RedisError, OSError, asyncio.TimeoutError):
+        return False
+
+
+async def readiness() -> dict:
+    """Readiness checks: {"models": bool, "redis": bool, ...}"""
+    checks = {
+        "models": _warm,
+        "redis": await redis_reachable(),
+    }
+
+    if _warm_up_error:
+        checks["error"] = _warm_up_error
+
+    return checks
@@ -0,0 +1,146 @@
+import argparse
+import json
+import sys
+
+import httpx
+
+# -----------------------------------
+# Batch client for /chat/batch
+# -----------------------------------
+# Reads one request per JSONL line and writes one result per line, in
+# the order the backend finishes them. Lines hold RequestState fields;
+# anything missing is taken from the command line options, and the
+# question may also be given as "query" or "body" instead of "messages"
+# (so task files with request_id/title/body lines work as-is).
+# A line with no question is reported as a failed result of its own
+# instead of stopping the run.
+#
+#   python -m multi_agent_app.batch_cli questions.jsonl -o results.jsonl
+
+BATCH_URL = "http://127.0.0.1:8000/chat/batch"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Send a JSONL file to /chat/batch")
+    parser.add_argument("input", help="JSONL file, or - for stdin")
+    parser.add_argument("-o", "--output", help="results file (default: stdout)")
+    parser.add_argument("--url", default=BATCH_URL)
+    parser.add_argument("--assistant-type", default="General")
+    parser.add_argument("--llm-type", default="Groq")
+    parser.add_argument("--model-name", default="llama-3.1-8b-instant")
+    parser.add_argument("--temperature", type=float, default=0.0)
+    parser.add_argument("--allow-search", action="store_true")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=600)
+    return parser.parse_args(argv)
+
+
+def to_item(line: dict, args, number: int) -> dict:
+    item = {
+        "assistant_type": args.assistant_type,
+        "llm_type": args.llm_type,
+        "model_name": args.model_name,
+        "temperature": args.temperature,
+        "allow_search": args.allow_search,
+        "enable_cache": not args.no_cache,
+    }
+    item.update(line)
+
+    item.setdefault("id", str(item.get("request_id", number)))
+
+    if "messages" not in item:
+        question = item.get("query") or item.get("body")
+        if not question:
+            raise ValueError(f"Line {number}: no messages, query or body")
+        item["messages"] = [question]
+
+    return item
+
+
+def read_items(path: str, args, errors: list = None) -> list[dict]:
+    """
+    Batch items for the valid lines of a JSONL file. Invalid lines are
+    appended to errors as result events (index = line position), or
+    reported on stderr when no list is given.
+    """
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+
+    with f:
+        lines = [json.loads(line) for line in f if line.strip()]
+
+    items = []
+
+    for n, line in enumerate(lines, start=1):
+        try:
+            items.append(to_item(line, args, n))
+        except ValueError as e:
+            error = {
+                "type": "result",
+                "index": n - 1,
+                "id": str(line.get("request_id", n)),
+                "error": str(e),
+            }
+            if errors is None:
+                print(error["error"], file=sys.stderr)
+            else:
+                errors.append(error)
+
+    return items
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    errors = []
+    items = read_items(args.input, args, errors)
+
+    # line position of every item, so results keep the input numbering
+    invalid = {error["index"] for error in errors}
+    positions = [n for n in range(len(items) + len(errors)) if n not in invalid]
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    counts = {"ok": 0, "error": len(errors), "cached": 0}
+
+    with out, httpx.Client(timeout=args.timeout) as client:
+
+        for error in errors:
+            out.write(json.dumps(error) + "\n")
+
+        for start in range(0, len(items), args.batch_size):
+            batch = items[start : start + args.batch_size]
+
+            with client.stream("POST", args.url, json={"items": batch}) as response:
+                response.raise_for_status()
+
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+
+                    event = json.loads(line)
+
+                    if event["type"] == "error":
+                        raise SystemExit(f"Batch failed: {event.get('detail')}")
+
+                    if event["type"] != "result":
+                        continue
+
+                    event["index"] = positions[event["index"] + start]
+                    out.write(json.dumps(event) + "\n")
+                    out.flush()
+
+                    if "error" in event:
+                        counts["error"] += 1
+                    else:
+                        counts["ok"] += 1
+                        if event["cache"] not in ("miss", "coalesced"):
+                            counts["cached"] += 1
+
+    print(
+        f"{counts['ok']} answered ({counts['cached']} from cache), "
+        f"{counts['error']} failed",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,207 @@
-from multi_agent_app.cache.exact_cache import exact_lookup, exact_store
+import asyncio
+
+from redis.exceptions import RedisError
+
+from multi_agent_app.cache.cache_policy import get_ttl
+from multi_agent_app.cache.cache_record import decode_record, encode_record, make_entry
+from multi_agent_app.cache.embeddings import aget_embedding, aget_embeddings
+from multi_agent_app.cache.exact_cache import (
+    exact_lookup,
+    exact_lookup_many,
+    exact_store,
+)
+from multi_agent_app.cache.query_classifier import classify_embedding
+from multi_agent_app.cache.redis_semantic_cache import (
+    redis_semantic_lookup,
+    redis_semantic_store,
+)
 from multi_agent_app.cache.semantic_cache import (
+    SIM_THRESHOLD,
     semantic_lookup,
     semantic_store_response,
 )
+from multi_agent_app.config.settings import settings
+from multi_agent_app.common.logger import get_logger
+from multi_agent_app.common.timing import stage
+
+logger = get_logger(__name__)
+
+
+class CacheLookup:
+    """
+    Per-request cache context returned by check_cache.
+
+    Holds the query embedding so a miss can be stored without encoding
+    the same query a second time.
+    """
+
+    def __init__(self, query, embedding=None):
+        self.query = query
+        self._embedding = embedding
+
+    async def get_embedding(self):
+        if self._embedding is None:
+            self._embedding = await aget_embedding(self.query)
+        return self._embedding
+
+
+# Redis problems (timeouts, connection errors, open circuit breaker) turn
+# into cache misses and skipped writes: the request is still answered,
+# only without the cache.
+async def _exact_lookup(query, config):
+    try:
+        return await exact_lookup(query, config)
+    except RedisError as e:
+        logger.warning(f"Exact cache unavailable: {str(e)}")
+        return None, False
+
+
+async def _redis_semantic_lookup(config, allow_search, embedding):
+    try:
+        return await redis_semantic_lookup(
+            config, allow_search, embedding, SIM_THRESHOLD
+        )
+    except RedisError as e:
+        logger.warning(f"Semantic cache unavailable: {str(e)}")
+        return None
+
+
+def _decode(record):
+    """Entry dict from a semantic hit; unreadable records count as misses"""
+    if record is None:
+        return None
+    try:
+        return decode_record(record)
+    except ValueError as e:
+        logger.warning(f"Unreadable cache record: {str(e)}")
+        return None
+
 
+# Both functions are awaitables: Redis goes through redis.asyncio, encoding
+# runs in the embedding pool and the index scan in a worker thread, so the
+# event loop stays free for other requests.
+#
+# Hits are returned as entry dicts (see cache_record): answer, suggestions,
+# category, created_at and model.
+async def check_cache(query, config, allow_search, history=None):
+    lookup = CacheLookup(query)
 
-def check_cache(query, config, allow_search, history=None):
     # L1 exact cache
-    res = exact_lookup(query, config)
+    # Entries past their soft TTL are still returned, typed "stale";
+    # the caller is expected to schedule a refresh
+    with stage("exact_lookup"):
+        res, stale = await _exact_lookup(query, config)
     if res:
-        return res, "exact"
+        return res, "stale" if stale else "exact", lookup
 
     # L2 semantic cache (now context aware)
-    res = semantic_lookup(query, config, allow_search)
+    with stage("embed"):
+        embedding = await lookup.get_embedding()
+
+    with stage("semantic_lookup"):
+        if settings.SEMANTIC_CACHE_BACKEND == "redis":
+            res = await _redis_semantic_lookup(config, allow_search, embedding)
+        else:
+            res = await asyncio.to_thread(
+                semantic_lookup, query, config, allow_search, embedding
+            )
+
+        res = _decode(res)
     if res:
-        return res, "semantic"
+        return res, "semantic", lookup
+
+    return None, None, lookup
+
+
+async def check_cache_many(items):
+    """
+    check_cache for a batch of (query, config, allow_search) items.
+
+    Exact hits are resolved with one MGET and all remaining queries are
+    embedded in one model batch before the semantic lookups. Returns a
+    list of (res, type, lookup) in input order.
+    """
+    try:
+        exact = await exact_lookup_many(
+            [(query, config) for query, config, _ in items]
+        )
+    except RedisError as e:
+        logger.warning(f"Exact cache unavailable: {str(e)}")
+        exact = [(None, False)] * len(items)
+
+    results = [None] * len(items)
+    misses = []
+
+    for i, ((query, config, _), (res, stale)) in enumerate(zip(items, exact)):
+        if res:
+            results[i] = (res, "stale" if stale else "exact", CacheLookup(query))
+        else:
+            misses.append(i)
+
+    embeddings = await aget_embeddings([items[i][0] for i in misses])
+
+    if settings.SEMANTIC_CACHE_BACKEND == "redis":
+        found = await asyncio.gather(
+            *(
+                _redis_semantic_lookup(items[i][1], items[i][2], emb)
+                for i, emb in zip(misses, embeddings)
+            )
+        )
+    else:
+        found = await asyncio.to_thread(
+            lambda: [
+                semantic_lookup(*items[i], emb) for i, emb in zip(misses, embeddings)
+            ]
+        )
+
+    for i, emb, res in zip(misses, embeddings, found):
+        res = _decode(res)
+        lookup = CacheLookup(items[i][0], emb)
+        results[i] = (res, "semantic", lookup) if res else (None, None, lookup)
+
+    return results
+
+
+async def store_all(
+    query, response, config, allow_search, lookup=None, suggestions=None, usage=None
+):
+    if lookup is None:
+        lookup = CacheLookup(query)
+
+    # Category-aware expiry: the local classifier reuses the query
+    # embedding, so no extra LLM call is needed to pick a TTL
+    with stage("classify"):
+        embedding = await lookup.get_embedding()
+        category = await asyncio.to_thread(classify_embedding, embedding)
+        ttl = get_ttl(category)
+
+    # encoded (and compressed) once, the same bytes go to every tier
+    record = encode_record(
+        make_entry(response, suggestions, category, config, usage)
+    )
 
-    return None, None
+    with stage("cache_store"):
+        try:
+            await exact_store(query, record, config, ttl=ttl)
+        except RedisError as e:
+            logger.warning(f"Exact cache write skipped: {str(e)}")
 
+        if settings.SEMANTIC_CACHE_BACKEND == "redis":
+            try:
+                await redis_semantic_store(
+                    query, record, config, allow_search, embedding, ttl
+                )
+            except RedisError as e:
+                logger.warning(f"Semantic cache write skipped: {str(e)}")
+        else:
+            await asyncio.to_thread(
+                semantic_store_response,
+                query,
+                record,
+                config,
+                allow_search,
+                embedding,
+                ttl,
+            )
 
-def store_all(query, response, config, allow_search):
-    exact_store(query, response, config)
-    semantic_store_response(query, response, config, allow_search)
+    return category
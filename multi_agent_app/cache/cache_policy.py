@@ -7,3 +7,25 @@ TTL_POLICY = {
     "general": 604800,  # 7 days
     "unknown": 3600,  # 1 hour fallback
 }
+
+
+def get_ttl(category: str) -> int:
+    """Cache lifetime in seconds for a query category"""
+    return TTL_POLICY.get(category, TTL_POLICY["unknown"])
+
+
+# Web search results go stale faster than answers built from them
+SEARCH_TTL_POLICY = {
+    "weather": 300,  # 5 minutes
+    "news": 600,  # 10 minutes
+    "crypto": 60,  # 1 minute
+    "stock": 60,  # 1 minute
+    "static": 86400,  # 1 day
+    "general": 3600,  # 1 hour
+    "unknown": 900,  # 15 minutes fallback
+}
+
+
+def get_search_ttl(category: str) -> int:
+    """Search result cache lifetime in seconds for a query category"""
+    return SEARCH_TTL_POLICY.get(category, SEARCH_TTL_POLICY["unknown"])
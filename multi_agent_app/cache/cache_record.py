@@ -0,0 +1,97 @@
+import json
+import time
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # optional: zlib is used instead
+    zstandard = None
+
+from multi_agent_app.config.settings import settings
+
+# ----------------------------
+# Cache record format
+# ----------------------------
+# Every cache tier stores the same compact binary record:
+#   byte 0     record version
+#   byte 1     body compression (RAW, ZLIB or ZSTD)
+#   bytes 2..  compact JSON entry, compressed once it is larger than
+#              CACHE_COMPRESS_MIN_BYTES
+#
+# Entry fields: answer, suggestions, category, created_at, model
+# (llm_type, model_name, temperature, assistant_type) and usage (token
+# usage of the LLM call that produced the answer, or None).
+#
+# Values written before this format existed are plain answer strings;
+# they are still read, with no suggestions.
+
+RECORD_VERSION = 1
+
+RAW, ZLIB, ZSTD = 0, 1, 2
+
+MODEL_FIELDS = ("llm_type", "model_name", "temperature", "assistant_type")
+
+
+def make_entry(
+    answer, suggestions=None, category=None, config=None, usage=None
+) -> dict:
+    config = config or {}
+    return {
+        "answer": answer,
+        "suggestions": list(suggestions or []),
+        "category": category,
+        "created_at": time.time(),
+        "model": {field: config.get(field) for field in MODEL_FIELDS},
+        "usage": usage,
+    }
+
+
+def _compress(body: bytes):
+    if len(body) < settings.CACHE_COMPRESS_MIN_BYTES:
+        return RAW, body
+
+    if settings.CACHE_COMPRESSION == "zstd" and zstandard is not None:
+        return ZSTD, zstandard.ZstdCompressor(level=3).compress(body)
+
+    return ZLIB, zlib.compress(body, 6)
+
+
+def encode_record(entry: dict) -> bytes:
+    body = json.dumps(entry, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    codec, body = _compress(body)
+    return bytes((RECORD_VERSION, codec)) + body
+
+
+def decode_record(data) -> dict:
+    """Entry from a stored record; raises ValueError if it is unreadable"""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    if len(data) < 2 or data[0] != RECORD_VERSION:
+        # legacy value: the bare answer text
+        return make_entry(data.decode("utf-8"))
+
+    codec, body = data[1], data[2:]
+
+    try:
+        if codec == ZLIB:
+            body = zlib.decompress(body)
+        elif codec == ZSTD:
+            if zstandard is None:
+                raise ValueError("zstd cache record but zstandard is not installed")
+            body = zstandard.ZstdDecompressor().decompress(body)
+        elif codec != RAW:
+            raise ValueError(f"Unknown cache record compression: {codec}")
+
+        entry = json.loads(body)
+
+    except ValueError:
+        raise
+    except Exception as e:
+        # zlib.error, zstandard.ZstdError: a corrupt body
+        raise ValueError(f"Corrupt cache record: {str(e)}") from e
+
+    if not isinstance(entry, dict) or "answer" not in entry:
+        raise ValueError("Cache record has no answer")
+
+    return entry
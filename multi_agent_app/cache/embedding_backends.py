@@ -0,0 +1,86 @@
+import numpy as np
+
+from multi_agent_app.config.settings import settings
+
+# ----------------------------
+# Embedding backends
+# ----------------------------
+# Implementations of the same model (EMBEDDING_MODEL) with different
+# runtimes, selected by EMBEDDING_BACKEND:
+#   "torch"      PyTorch fp32 (reference)
+#   "torch-int8" PyTorch with dynamically quantized int8 Linear layers
+#   "onnx"       ONNX Runtime; EMBEDDING_ONNX_FILE picks an exported
+#                variant, e.g. onnx/model_qint8_avx512_vnni.onnx
+#                (needs the onnxruntime and optimum packages)
+#
+# Every backend must keep cosine scores close enough to the reference
+# that SIM_THRESHOLD keeps its meaning; check a backend with
+#   python -m multi_agent_app.cache.embedding_parity --backend <name>
+
+
+class EmbeddingBackend:
+    """Encodes texts into embedding rows"""
+
+    name = "base"
+
+    def dimension(self) -> int:
+        raise NotImplementedError
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        """One row per text (not normalized)"""
+        raise NotImplementedError
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+
+    def __init__(self, model_name: str, runtime: str = "torch", model_kwargs=None):
+        # imported here: pulls in PyTorch, which takes seconds
+        from sentence_transformers import SentenceTransformer
+
+        self.name = runtime
+        self.model = SentenceTransformer(
+            model_name,
+            backend=runtime,
+            model_kwargs=model_kwargs or None,
+        )
+
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        return np.asarray(self.model.encode(texts))
+
+
+class QuantizedTorchBackend(SentenceTransformerBackend):
+    """PyTorch model with int8 weights for its Linear layers"""
+
+    def __init__(self, model_name: str):
+        import torch
+
+        super().__init__(model_name)
+        self.name = "torch-int8"
+        torch.ao.quantization.quantize_dynamic(
+            self.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+        )
+
+
+def load_backend(name: str = None, model_name: str = None) -> EmbeddingBackend:
+    """Build the configured embedding backend"""
+    name = name or settings.EMBEDDING_BACKEND
+    model_name = model_name or settings.EMBEDDING_MODEL
+
+    if name == "torch":
+        return SentenceTransformerBackend(model_name)
+
+    if name == "torch-int8":
+        return QuantizedTorchBackend(model_name)
+
+    if name == "onnx":
+        model_kwargs = (
+            {"file_name": settings.EMBEDDING_ONNX_FILE}
+            if settings.EMBEDDING_ONNX_FILE
+            else None
+        )
+        return SentenceTransformerBackend(model_name, "onnx", model_kwargs)
+
+    raise ValueError(f"Unsupported embedding backend: {name}")
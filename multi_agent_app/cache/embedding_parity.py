@@ -0,0 +1,115 @@
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from multi_agent_app.cache.embedding_backends import load_backend
+from multi_agent_app.cache.query_classifier import CATEGORY_EXAMPLES
+from multi_agent_app.cache.semantic_cache import SIM_THRESHOLD
+
+# ----------------------------
+# Embedding backend parity check
+# ----------------------------
+# Compares a candidate backend with the PyTorch reference on the same
+# texts and fails (exit code 1) if
+#   - any text's candidate embedding drifts from the reference
+#     (cosine below --min-cosine), or
+#   - any pairwise similarity score moves by more than --tolerance,
+#     which would shift what SIM_THRESHOLD accepts.
+# Also reports single-text encode latency for both backends.
+#
+#   python -m multi_agent_app.cache.embedding_parity --backend onnx
+
+# Paraphrases (should hit the semantic cache) and near misses
+PARITY_PAIRS = [
+    ("what is the capital of france", "which city is the capital of france"),
+    ("how do vaccines work", "explain how vaccines work"),
+    ("bitcoin price now", "current price of bitcoin"),
+    ("what is compound interest", "define compound interest"),
+    ("tips to sleep better", "how can I improve my sleep"),
+    ("what is a contract", "what is a tort"),
+    ("apple stock price today", "apple pie recipe"),
+    ("symptoms of flu", "symptoms of covid"),
+    ("how do I file taxes", "how do I file a lawsuit"),
+    ("weather in london tomorrow", "weather in paris tomorrow"),
+]
+
+
+def _unit(rows: np.ndarray) -> np.ndarray:
+    rows = np.asarray(rows, dtype=np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def _latency_ms(backend, texts, repeats: int) -> float:
+    """Median single-text encode time"""
+    timings = []
+    for _ in range(repeats):
+        for text in texts:
+            started = time.perf_counter()
+            backend.encode([text])
+            timings.append(time.perf_counter() - started)
+    return float(np.median(timings) * 1000)
+
+
+def check_parity(candidate, reference, min_cosine: float, tolerance: float) -> dict:
+    texts = [t for examples in CATEGORY_EXAMPLES.values() for t in examples]
+    texts += [t for pair in PARITY_PAIRS for t in pair]
+
+    ref = _unit(reference.encode(texts))
+    cand = _unit(candidate.encode(texts))
+    per_text = np.sum(ref * cand, axis=1)
+
+    # every pair of texts, not only PARITY_PAIRS
+    ref_scores = ref @ ref.T
+    cand_scores = cand @ cand.T
+    upper = np.triu_indices(len(texts), k=1)
+    drift = np.abs(ref_scores - cand_scores)[upper]
+
+    # decisions that flip at SIM_THRESHOLD although the reference score
+    # was clearly on one side of it
+    ref_hit = ref_scores[upper] >= SIM_THRESHOLD
+    cand_hit = cand_scores[upper] >= SIM_THRESHOLD
+    clear = np.abs(ref_scores[upper] - SIM_THRESHOLD) > tolerance
+    flips = int(np.sum((ref_hit != cand_hit) & clear))
+
+    return {
+        "texts": len(texts),
+        "min_cosine_to_reference": float(per_text.min()),
+        "max_score_drift": float(drift.max()),
+        "mean_score_drift": float(drift.mean()),
+        "threshold_flips": flips,
+        "passed": bool(
+            per_text.min() >= min_cosine and drift.max() <= tolerance and flips == 0
+        ),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check an embedding backend against PyTorch")
+    parser.add_argument("--backend", required=True, help="torch-int8 or onnx")
+    parser.add_argument("--reference", default="torch")
+    parser.add_argument("--min-cosine", type=float, default=0.99)
+    parser.add_argument("--tolerance", type=float, default=0.02)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    reference = load_backend(args.reference)
+    candidate = load_backend(args.backend)
+
+    report = check_parity(candidate, reference, args.min_cosine, args.tolerance)
+    report["backend"] = args.backend
+    report["reference"] = args.reference
+    report["sim_threshold"] = SIM_THRESHOLD
+
+    sample = [pair[0] for pair in PARITY_PAIRS]
+    report["reference_latency_ms"] = _latency_ms(reference, sample, args.repeats)
+    report["backend_latency_ms"] = _latency_ms(candidate, sample, args.repeats)
+
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
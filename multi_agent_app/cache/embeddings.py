@@ -0,0 +1,245 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from multi_agent_app.cache.embedding_backends import load_backend
+from multi_agent_app.common.bounded_cache import BoundedCache
+from multi_agent_app.common.metrics import EMBEDDING_BATCH_SIZE, EMBEDDING_QUEUE_WAIT
+from multi_agent_app.config.settings import settings
+
+# ----------------------------
+# Load embedding model once
+# ----------------------------
+# Runtime (PyTorch, int8, ONNX) is chosen by EMBEDDING_BACKEND. Loaded on
+# first use (or by warm_up_embeddings from the API lifespan), so importing
+# the cache does not load PyTorch and the model weights.
+_backend = None
+_backend_lock = threading.Lock()
+
+# number of recent query embeddings kept in memory
+EMBEDDING_MEMO_SIZE = 2048
+
+# LRU memo of normalized text -> normalized embedding, so repeated prompts
+# and suggestion clicks never re-run the model
+_embedding_memo = BoundedCache("embedding", max_size=EMBEDDING_MEMO_SIZE)
+
+# Dedicated pool for backend.encode. Encoding is CPU-bound, so running it on
+# the event loop would stall every concurrent request.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.EMBEDDING_WORKERS,
+    thread_name_prefix="embedding",
+)
+
+# Back-pressure: bounds queued + running encodes (created on first use so
+# it belongs to the serving event loop)
+_pending_slots = None
+
+
+def get_backend():
+    global _backend
+
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = load_backend()
+
+    return _backend
+
+
+def is_loaded() -> bool:
+    return _backend is not None
+
+
+def embedding_dim() -> int:
+    return get_backend().dimension()
+
+
+def normalize_text(text: str) -> str:
+    """Memo key: the embedding model is uncased and ignores extra whitespace"""
+    return " ".join(text.split()).lower()
+
+
+def normalize(embedding) -> np.ndarray:
+    """Return a float32 unit vector for inner-product search"""
+    emb = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(emb)
+    return emb / norm if norm else emb
+
+
+def _encode(text: str) -> np.ndarray:
+    emb = normalize(get_backend().encode([text])[0])
+    # shared between callers, so it must never be modified in place
+    emb.setflags(write=False)
+    return emb
+
+
+def _encode_batch(texts: list[str]) -> list[np.ndarray]:
+    """One backend.encode call for many texts"""
+    embs = []
+    for row in get_backend().encode(texts):
+        emb = normalize(row)
+        emb.setflags(write=False)
+        embs.append(emb)
+    return embs
+
+
+def get_embedding(text: str) -> np.ndarray:
+    """Generate a normalized embedding for text, reusing recent results"""
+    key = normalize_text(text)
+
+    emb = _embedding_memo.get(key)
+    if emb is None:
+        emb = _encode(text)
+        _embedding_memo.set(key, emb)
+
+    return emb
+
+
+# ----------------------------
+# Micro-batching scheduler
+# ----------------------------
+# Concurrent requests each need one embedding, but the model encodes a
+# batch of sentences almost as fast as a single one. Misses are queued
+# for up to EMBEDDING_BATCH_MAX_WAIT_MS (or until EMBEDDING_BATCH_MAX_SIZE
+# texts are waiting) and encoded together; identical texts in the queue
+# share one slot.
+class EmbeddingBatcher:
+
+    def __init__(self, max_size: int, max_wait: float):
+        self.max_size = max_size
+        self.max_wait = max_wait
+
+        # memo key -> (text, future, enqueue time)
+        self._queue: dict[str, tuple] = {}
+        self._timer = None
+        self._tasks = set()
+
+    async def encode(self, key: str, text: str) -> np.ndarray:
+        entry = self._queue.get(key)
+
+        if entry is None:
+            loop = asyncio.get_running_loop()
+            entry = (text, loop.create_future(), time.monotonic())
+            self._queue[key] = entry
+
+            if len(self._queue) >= self.max_size:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.max_wait, self._flush)
+
+        # shielded: one caller giving up must not cancel the shared result
+        return await asyncio.shield(entry[1])
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch = list(self._queue.items())
+        self._queue = {}
+
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        now = time.monotonic()
+        for _, (_, _, queued_at) in batch:
+            EMBEDDING_QUEUE_WAIT.observe(now - queued_at)
+        EMBEDDING_BATCH_SIZE.observe(len(batch))
+
+        try:
+            loop = asyncio.get_running_loop()
+            embs = await loop.run_in_executor(
+                _executor, _encode_batch, [text for _, (text, _, _) in batch]
+            )
+
+        except Exception as e:
+            for _, (_, future, _) in batch:
+                if not future.done():
+                    future.set_exception(e)
+                    # retrieved here in case every caller was cancelled
+                    future.exception()
+            return
+
+        for (key, (_, future, _)), emb in zip(batch, embs):
+            _embedding_memo.set(key, emb)
+            if not future.done():
+                future.set_result(emb)
+
+
+# created on first use so it belongs to the serving event loop
+_batcher = None
+
+
+def _get_batcher() -> EmbeddingBatcher:
+    """Create the pending-slot semaphore and the batcher together, once"""
+    global _pending_slots, _batcher
+
+    if _batcher is None:
+        _pending_slots = asyncio.Semaphore(settings.EMBEDDING_MAX_PENDING)
+        _batcher = EmbeddingBatcher(
+            settings.EMBEDDING_BATCH_MAX_SIZE,
+            settings.EMBEDDING_BATCH_MAX_WAIT_MS / 1000,
+        )
+
+    return _batcher
+
+
+async def aget_embedding(text: str) -> np.ndarray:
+    """Async get_embedding: memo hits return inline, misses are micro-batched"""
+    key = normalize_text(text)
+
+    emb = _embedding_memo.get(key)
+    if emb is not None:
+        return emb
+
+    batcher = _get_batcher()
+
+    async with _pending_slots:
+        # may have been encoded while this caller waited for a slot
+        emb = _embedding_memo.get(key)
+        if emb is not None:
+            return emb
+
+        return await batcher.encode(key, text)
+
+
+async def aget_embeddings(texts: list[str]) -> list[np.ndarray]:
+    """
+    Batched aget_embedding: memo hits are reused and all remaining texts
+    are encoded together in a single backend.encode call.
+    """
+    keys = [normalize_text(text) for text in texts]
+    found = {key: _embedding_memo.get(key) for key in keys}
+
+    # one text per distinct missing key
+    missing = {}
+    for key, text in zip(keys, texts):
+        if found[key] is None and key not in missing:
+            missing[key] = text
+
+    if missing:
+        _get_batcher()
+
+        async with _pending_slots:
+            loop = asyncio.get_running_loop()
+            embs = await loop.run_in_executor(
+                _executor, _encode_batch, list(missing.values())
+            )
+
+        for key, emb in zip(missing, embs):
+            _embedding_memo.set(key, emb)
+            found[key] = emb
+
+    return [found[key] for key in keys]
+
+
+async def warm_up_embeddings():
+    """Load the model and run one encode in the embedding pool"""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(_executor, _encode, "warm up")
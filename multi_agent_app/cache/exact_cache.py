@@ -1,7 +1,20 @@
-import redis
 import hashlib
 
-r = redis.Redis(host="localhost", port=6379, db=0, decode_responses=True)
+from multi_agent_app.cache.cache_record import decode_record
+from multi_agent_app.cache.redis_client import get_binary_redis
+from multi_agent_app.config.settings import settings
+from multi_agent_app.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Stale-while-revalidate:
+#   <key>        the answer, kept for ttl + stale window (hard TTL)
+#   <key>:fresh  marker kept for ttl only (soft TTL)
+# Once the marker expires the answer is still served, flagged stale,
+# while a single background refresh replaces it.
+#
+# Values are binary records from cache_record.py.
+FRESH_SUFFIX = ":fresh"
 
 
 def make_key(query, config):
@@ -9,11 +22,73 @@ def make_key(query, config):
     return hashlib.sha256(raw.encode()).hexdigest()
 
 
-def exact_lookup(query, config):
+def stale_window(ttl):
+    """How long an entry may be served stale after its soft TTL"""
+    return min(ttl, settings.EXACT_CACHE_MAX_STALE_SECONDS)
+
+
+def _decode(key, record):
+    """Entry for a stored record, None if it is unreadable"""
+    try:
+        return decode_record(record)
+    except ValueError as e:
+        logger.warning(f"Unreadable exact cache record {key}: {str(e)}")
+        return None
+
+
+async def exact_lookup(query, config):
+    """Return (entry, stale); (None, False) on a miss"""
     key = make_key(query, config)
-    return r.get(key)
+    record, fresh = await get_binary_redis().mget(key, key + FRESH_SUFFIX)
+
+    if record is None:
+        return None, False
+
+    entry = _decode(key, record)
+    if entry is None:
+        # unreadable: drop it so the miss can be stored again
+        await get_binary_redis().delete(key, key + FRESH_SUFFIX)
+        return None, False
+
+    return entry, fresh is None
+
 
+async def exact_lookup_many(items):
+    """
+    exact_lookup for many (query, config) pairs in a single MGET.
+    Returns a list of (response, stale) in the same order.
+    """
+    if not items:
+        return []
 
-def exact_store(query, response, config):
+    keys = []
+    for query, config in items:
+        key = make_key(query, config)
+        keys += [key, key + FRESH_SUFFIX]
+
+    values = await get_binary_redis().mget(keys)
+
+    results = []
+    unreadable = []
+
+    for key, record, fresh in zip(keys[0::2], values[0::2], values[1::2]):
+        entry = None if record is None else _decode(key, record)
+
+        if record is not None and entry is None:
+            unreadable += [key, key + FRESH_SUFFIX]
+
+        results.append((None, False) if entry is None else (entry, fresh is None))
+
+    if unreadable:
+        await get_binary_redis().delete(*unreadable)
+
+    return results
+
+
+async def exact_store(query, record: bytes, config, ttl=3600):
     key = make_key(query, config)
-    r.set(key, response, ex=3600)  # 1h TTL
+
+    async with get_binary_redis().pipeline(transaction=True) as pipe:
+        pipe.set(key, record, ex=ttl + stale_window(ttl))
+        pipe.set(key + FRESH_SUFFIX, 1, ex=ttl)  # 1h TTL by default
+        await pipe.execute()
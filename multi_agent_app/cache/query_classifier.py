@@ -1,5 +1,7 @@
-from langchain_groq import ChatGroq
-from langchain_core.messages import HumanMessage
+import threading
+
+import numpy as np
+from multi_agent_app.cache.embeddings import get_embedding, normalize
 
 CLASSIFIER_PROMPT = """
 Classify the query into exactly one word:
@@ -9,6 +11,9 @@ Return only the word.
 
 
 async def classify_query(query: str) -> str:
+    from langchain_groq import ChatGroq
+    from langchain_core.messages import HumanMessage
+
     llm = ChatGroq(
         model="llama-3.1-8b-instant",
         temperature=0,
@@ -19,3 +24,90 @@ async def classify_query(query: str) -> str:
     )
 
     return response.content.strip().lower()
+
+
+# ----------------------------
+# Local embedding classifier
+# ----------------------------
+# Nearest-centroid classifier over the query embedding the cache already
+# computed, so choosing a TTL costs one small matrix product instead of an
+# extra LLM call on the hot path.
+
+CATEGORY_EXAMPLES = {
+    "weather": [
+        "what is the weather today",
+        "will it rain tomorrow",
+        "temperature forecast for this weekend",
+        "is it snowing in the city right now",
+    ],
+    "news": [
+        "latest news headlines today",
+        "what happened in the election this week",
+        "breaking news about the earthquake",
+        "recent announcements from the government",
+    ],
+    "crypto": [
+        "bitcoin price now",
+        "current ethereum price in usd",
+        "how much is one btc today",
+        "crypto market prices right now",
+    ],
+    "stock": [
+        "apple stock price today",
+        "current share price of tesla",
+        "how is the s&p 500 doing right now",
+        "nasdaq index value today",
+    ],
+    "static": [
+        "define photosynthesis",
+        "what is the pythagorean theorem",
+        "explain how vaccines work",
+        "what is compound interest",
+        "what does habeas corpus mean",
+    ],
+    "general": [
+        "give me tips to improve my sleep",
+        "how should I plan a budget",
+        "write a short summary of a contract",
+        "what are good habits for studying",
+    ],
+}
+
+# Best centroid score below which a query is left as "unknown"
+CLASSIFIER_MIN_SCORE = 0.3
+
+_centroids = None
+_centroid_labels: list[str] = []
+_centroid_lock = threading.Lock()
+
+
+def load_centroids():
+    """Embed the category examples once (also run during warm-up)"""
+    global _centroids, _centroid_labels
+
+    with _centroid_lock:
+        if _centroids is not None:
+            return
+
+        labels, rows = [], []
+        for category, examples in CATEGORY_EXAMPLES.items():
+            embs = np.stack([get_embedding(example) for example in examples])
+            labels.append(category)
+            rows.append(normalize(embs.mean(axis=0)))
+
+        _centroid_labels = labels
+        _centroids = np.stack(rows)
+
+
+def classify_embedding(embedding) -> str:
+    """Classify a normalized query embedding into a TTL_POLICY category"""
+    if _centroids is None:
+        load_centroids()
+
+    scores = _centroids @ embedding
+    best = int(np.argmax(scores))
+
+    if scores[best] < CLASSIFIER_MIN_SCORE:
+        return "unknown"
+
+    return _centroid_labels[best]
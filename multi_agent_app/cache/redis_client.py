@@ -0,0 +1,190 @@
+import asyncio
+import threading
+import time
+
+import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import RedisError, ResponseError
+
+from multi_agent_app.common.metrics import (
+    CACHE_BACKEND_FAILURES,
+    CACHE_BACKEND_LATENCY,
+    CACHE_BREAKER_STATE,
+)
+from multi_agent_app.config.settings import settings
+
+# ----------------------------
+# Shared Redis client
+# ----------------------------
+# One pooled client per process with connect/read timeouts, so a slow or
+# unreachable Redis fails fast instead of holding requests. Every command
+# and pipeline goes through a circuit breaker: after
+# REDIS_BREAKER_FAILURES consecutive connection/timeout errors, calls fail
+# immediately with CircuitOpenError (a RedisError, so existing handlers
+# treat it as "cache unavailable") until REDIS_BREAKER_RESET_SECONDS have
+# passed and a trial call succeeds.
+#
+# Latency and failures per operation are exported to Prometheus.
+
+_client = None
+_binary_client = None
+
+
+class CircuitOpenError(RedisError):
+    """Raised instead of calling Redis while the breaker is open"""
+
+
+class CircuitBreaker:
+
+    CLOSED, OPEN, HALF_OPEN = 0, 1, 2
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_seconds:
+                    return False
+                self._set_state(self.HALF_OPEN)
+
+            # half-open: let a single trial call through
+            if self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._trial_running = False
+            self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._set_state(self.OPEN)
+
+    def abandon(self):
+        """A call was cancelled before Redis answered"""
+        with self._lock:
+            self._trial_running = False
+
+    def _set_state(self, state):
+        self.state = state
+        CACHE_BREAKER_STATE.set(state)
+
+
+breaker = CircuitBreaker(
+    settings.REDIS_BREAKER_FAILURES,
+    settings.REDIS_BREAKER_RESET_SECONDS,
+)
+
+
+async def _guarded(operation: str, call):
+    """Run one Redis round trip through the breaker, recording metrics"""
+    if not breaker.allow():
+        CACHE_BACKEND_FAILURES.labels(operation=operation, reason="circuit_open").inc()
+        raise CircuitOpenError("Redis circuit breaker is open")
+
+    started = time.perf_counter()
+
+    try:
+        result = await call()
+
+    except ResponseError:
+        # the server answered: an error reply says nothing about its health
+        breaker.record_success()
+        CACHE_BACKEND_FAILURES.labels(operation=operation, reason="response").inc()
+        raise
+
+    except asyncio.CancelledError:
+        breaker.abandon()
+        raise
+
+    except (RedisError, OSError) as e:
+        breaker.record_failure()
+        CACHE_BACKEND_FAILURES.labels(
+            operation=operation, reason=type(e).__name__
+        ).inc()
+        raise
+
+    else:
+        breaker.record_success()
+        return result
+
+    finally:
+        CACHE_BACKEND_LATENCY.labels(operation=operation).observe(
+            time.perf_counter() - started
+        )
+
+
+class GuardedPipeline(Pipeline):
+
+    async def execute(self, raise_on_error: bool = True):
+        execute = super().execute
+        return await _guarded("pipeline", lambda: execute(raise_on_error))
+
+
+class GuardedRedis(redis.Redis):
+
+    async def execute_command(self, *args, **options):
+        execute = super().execute_command
+        operation = str(args[0]).lower() if args else "unknown"
+        return await _guarded(operation, lambda: execute(*args, **options))
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> Pipeline:
+        return GuardedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+def _make_client(decode_responses: bool) -> GuardedRedis:
+    # callers wait (up to the socket timeout) for a free connection
+    # instead of failing when all of them are in use
+    pool = redis.BlockingConnectionPool(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        timeout=settings.REDIS_SOCKET_TIMEOUT,
+        health_check_interval=30,
+        decode_responses=decode_responses,
+    )
+    return GuardedRedis(connection_pool=pool)
+
+
+def get_redis():
+    """Return the process-wide async Redis client (str values)"""
+    global _client
+
+    if _client is None:
+        _client = _make_client(decode_responses=True)
+
+    return _client
+
+
+def get_binary_redis():
+    """Client returning raw bytes, for binary cache records"""
+    global _binary_client
+
+    if _binary_client is None:
+        _binary_client = _make_client(decode_responses=False)
+
+    return _binary_client
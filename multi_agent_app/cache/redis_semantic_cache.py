@@ -0,0 +1,160 @@
+import hashlib
+from typing import Optional
+
+import numpy as np
+from redis.exceptions import ResponseError
+from redis.commands.search.field import TagField, TextField, VectorField
+from redis.commands.search.query import Query
+
+try:
+    from redis.commands.search.index_definition import IndexDefinition, IndexType
+except ImportError:  # redis-py < 6
+    from redis.commands.search.indexDefinition import IndexDefinition, IndexType
+
+from multi_agent_app.cache.embeddings import embedding_dim
+from multi_agent_app.cache.redis_client import get_redis
+from multi_agent_app.config.settings import settings
+from multi_agent_app.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+# ----------------------------
+# Shared semantic cache (Redis vector search)
+# ----------------------------
+# Every uvicorn worker and replica reads and writes the same index, so an
+# answer stored by one process is a semantic hit for all of them and no
+# process holds its own copy of the embeddings. Requires a Redis server
+# with the search module (Redis Stack or Redis 8+).
+#
+# Entries are hashes under SEMANTIC_KEY_PREFIX:
+#   embedding      float32 bytes of the normalized query embedding
+#   response       cache record (cache_record.py)
+#   query          original query text
+#   assistant_type / llm_type / tool_enabled   context tags
+# Expiry uses the category TTL via EXPIRE; capacity is left to the
+# server's maxmemory policy (volatile-lru evicts these keys first).
+
+SEMANTIC_KEY_PREFIX = "semcache:"
+
+# Characters that must be escaped inside a TAG query
+_TAG_SPECIAL = set(",.<>{}[]\"':;!@#$%^&*()-+=~|/\\ ")
+
+_index_ready = False
+
+
+def _escape_tag(value: str) -> str:
+    return "".join(f"\\{c}" if c in _TAG_SPECIAL else c for c in value)
+
+
+def _entry_key(query: str, config: dict, tool_enabled: bool) -> str:
+    raw = f"{config['assistant_type']}|{config['llm_type']}|{bool(tool_enabled)}|{query}"
+    return SEMANTIC_KEY_PREFIX + hashlib.sha256(raw.encode()).hexdigest()
+
+
+async def ensure_index():
+    """Create the vector index once; a no-op if another worker already did"""
+    global _index_ready
+
+    if _index_ready:
+        return
+
+    schema = (
+        TagField("assistant_type"),
+        TagField("llm_type"),
+        TagField("tool_enabled"),
+        TextField("query"),
+        VectorField(
+            "embedding",
+            "HNSW",
+            {
+                "TYPE": "FLOAT32",
+                "DIM": embedding_dim(),
+                "DISTANCE_METRIC": "COSINE",
+            },
+        ),
+    )
+
+    try:
+        await get_redis().ft(settings.SEMANTIC_INDEX_NAME).create_index(
+            schema,
+            definition=IndexDefinition(
+                prefix=[SEMANTIC_KEY_PREFIX],
+                index_type=IndexType.HASH,
+            ),
+        )
+        logger.info(f"Created semantic index {settings.SEMANTIC_INDEX_NAME}")
+
+    except ResponseError as e:
+        if "already exists" not in str(e).lower():
+            raise
+
+    _index_ready = True
+
+
+async def redis_semantic_lookup(
+    config: dict,
+    tool_enabled: bool,
+    embedding: np.ndarray,
+    threshold: float,
+) -> Optional[bytes]:
+    """Nearest cached answer in the same context, if similar enough"""
+    await ensure_index()
+
+    context = (
+        f"@assistant_type:{{{_escape_tag(config['assistant_type'])}}} "
+        f"@llm_type:{{{_escape_tag(config['llm_type'])}}} "
+        f"@tool_enabled:{{{int(bool(tool_enabled))}}}"
+    )
+
+    query = (
+        Query(f"({context})=>[KNN 1 @embedding $vec AS distance]")
+        .sort_by("distance")
+        .return_field("response", decode_field=False)
+        .return_field("distance")
+        .dialect(2)
+    )
+
+    result = await get_redis().ft(settings.SEMANTIC_INDEX_NAME).search(
+        query,
+        query_params={"vec": np.asarray(embedding, dtype=np.float32).tobytes()},
+    )
+
+    if not result.docs:
+        return None
+
+    best = result.docs[0]
+
+    # COSINE distance is 1 - cosine similarity
+    if 1.0 - float(best.distance) >= threshold:
+        return best.response
+
+    return None
+
+
+async def redis_semantic_store(
+    query: str,
+    response: bytes,
+    config: dict,
+    tool_enabled: bool,
+    embedding: np.ndarray,
+    ttl: int,
+):
+    """Write one entry to the shared index with its category TTL"""
+    await ensure_index()
+
+    key = _entry_key(query, config, tool_enabled)
+
+    async with get_redis().pipeline(transaction=True) as pipe:
+        pipe.hset(
+            key,
+            mapping={
+                "embedding": np.asarray(embedding, dtype=np.float32).tobytes(),
+                "response": response,
+                "query": query,
+                "assistant_type": config["assistant_type"],
+                "llm_type": config["llm_type"],
+                "tool_enabled": int(bool(tool_enabled)),
+            },
+        )
+        pipe.expire(key, ttl)
+        await pipe.execute()
@@ -1,80 +1,426 @@
+import sys
+import threading
+import time
+from contextlib import ExitStack
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, List, Tuple
 
-# ----------------------------
-# Load embedding model once
-# ----------------------------
-model = SentenceTransformer("all-MiniLM-L6-v2")
+from multi_agent_app.cache.embeddings import embedding_dim, get_embedding
+from multi_agent_app.common.metrics import (
+    SEMANTIC_CACHE_BYTES,
+    SEMANTIC_CACHE_ENTRIES,
+    SEMANTIC_CACHE_EVICTIONS,
+)
+from multi_agent_app.config.settings import settings
+
+# FAISS is optional: when installed its BLAS kernels run the top-k search,
+# otherwise the same inner-product query runs through NumPy.
+try:
+    import faiss
+except ImportError:  # pragma: no cover - depends on the environment
+    faiss = None
 
 # similarity threshold (tune)
 SIM_THRESHOLD = 0.88
 
-# in-memory semantic cache store
-# structure:
-# {
-#   "query": {
-#       "embedding": np.array,
-#       "response": str,
-#       "assistant_type": str,
-#       "llm_type": str,
-#       "tool_enabled": bool
-#   }
-# }
-semantic_store: Dict[str, Dict[str, Any]] = {}
+# entry lifetime in seconds when the caller does not pick one
+DEFAULT_TTL = 3600
+
+# rows allocated the first time a partition receives an entry
+INITIAL_CAPACITY = 256
+
+# capacity eviction frees space down to this fraction of the limits,
+# so a full cache does not evict on every single insert
+EVICTION_LOW_WATERMARK = 0.9
+
+# rows upcast to float32 at a time when embeddings are stored as float16
+SCORE_CHUNK_ROWS = 8192
+
+# expired rows are skipped by searches and only compacted away once they
+# make up this fraction of a partition (or by enforce_limits), so the
+# O(n) rebuild does not run on every lookup after one row expires
+EXPIRED_COMPACT_FRACTION = 0.25
 
 
 # ----------------------------
-# Utility functions
+# Vector index
 # ----------------------------
-def get_embedding(text: str):
-    """Generate embedding for text"""
-    return model.encode(text)
+class PartitionIndex:
+    """
+    Contiguous, pre-normalized embedding matrix for one cache context.
+
+    Rows are L2-normalized on insert, so cosine similarity against the
+    whole partition is a single matrix-vector inner product. Per-row
+    expiry, last access and size live in parallel NumPy arrays; searches
+    never return expired rows, which are compacted away in bulk.
+    """
+
+    def __init__(self, dim: int, dtype=np.float32):
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.embeddings = np.empty((INITIAL_CAPACITY, dim), dtype=self.dtype)
+        self.expires_at = np.empty(INITIAL_CAPACITY, dtype=np.float64)
+        self.last_access = np.empty(INITIAL_CAPACITY, dtype=np.float64)
+        self.entry_bytes = np.empty(INITIAL_CAPACITY, dtype=np.int64)
+        self.next_expiry = float("inf")
+        self.size = 0
+        self.nbytes = 0
+        self.queries: List[str] = []
+        self.responses: List[bytes] = []
+        # query text -> row, so re-storing a query overwrites its entry
+        self.positions: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+        # fixed per-row cost: embedding + the three parallel arrays
+        self.row_bytes = dim * self.dtype.itemsize + 3 * 8
+
+    def __len__(self):
+        return self.size
+
+    def add(self, query: str, embedding: np.ndarray, response: bytes, ttl: float):
+        """Insert or overwrite the entry for query, expiring after ttl seconds"""
+        now = time.time()
+        expires_at = now + ttl
+        size = self.row_bytes + sys.getsizeof(query) + sys.getsizeof(response)
+
+        with self.lock:
+            row = self.positions.get(query)
+
+            if row is None:
+                if self.size == len(self.embeddings):
+                    self._grow()
+                row = self.size
+                self.size += 1
+                self.positions[query] = row
+                self.queries.append(query)
+                self.responses.append(response)
+            else:
+                self.responses[row] = response
+                self.nbytes -= int(self.entry_bytes[row])
+
+            self.embeddings[row] = embedding
+            self.expires_at[row] = expires_at
+            self.last_access[row] = now
+            self.entry_bytes[row] = size
+            self.nbytes += size
+            self.next_expiry = min(self.next_expiry, expires_at)
+
+    def extend(
+        self,
+        queries: List[str],
+        embeddings: np.ndarray,
+        responses: List[bytes],
+        expires_at: np.ndarray,
+    ) -> int:
+        """
+        Bulk-insert entries (snapshot warm start). Queries already present
+        are skipped, since entries stored since boot are newer.
+        Returns the number of rows added.
+        """
+        now = time.time()
+
+        with self.lock:
+            rows = [
+                i
+                for i, query in enumerate(queries)
+                if query not in self.positions and expires_at[i] > now
+            ]
+            if not rows:
+                return 0
+
+            while self.size + len(rows) > len(self.embeddings):
+                self._grow()
+
+            start, end = self.size, self.size + len(rows)
+            self.embeddings[start:end] = embeddings[rows]
+            self.expires_at[start:end] = expires_at[rows]
+            self.last_access[start:end] = now
+
+            for offset, i in enumerate(rows):
+                query, response = queries[i], responses[i]
+                self.positions[query] = start + offset
+                self.queries.append(query)
+                self.responses.append(response)
+                self.entry_bytes[start + offset] = (
+                    self.row_bytes + sys.getsizeof(query) + sys.getsizeof(response)
+                )
+
+            self.size = end
+            self.nbytes += int(self.entry_bytes[start:end].sum())
+            self._refresh_next_expiry()
+
+        return len(rows)
+
+    def search(
+        self,
+        query_emb: np.ndarray,
+        k: int = 1,
+        min_score: Optional[float] = None,
+    ) -> List[Tuple[float, bytes]]:
+        """
+        Return the top-k (score, response) pairs for a normalized query.
+        Rows scoring at least min_score count as used for LRU eviction.
+        """
+        with self.lock:
+            now = time.time()
+            expired = None
+
+            if self.next_expiry <= now:
+                expired = self.expires_at[: self.size] <= now
+                if expired.sum() >= EXPIRED_COMPACT_FRACTION * self.size:
+                    self.purge_expired()
+                    expired = None
+
+            live = self.size if expired is None else self.size - int(expired.sum())
+            if live == 0:
+                return []
+
+            k = min(k, live)
+
+            if faiss is not None and self.dtype == np.float32:
+                # ask for enough neighbours that k live rows remain
+                wanted = k if expired is None else min(self.size, k + self.size - live)
+                scores, rows = faiss.knn(
+                    query_emb.reshape(1, -1),
+                    self.embeddings[: self.size],
+                    wanted,
+                    metric=faiss.METRIC_INNER_PRODUCT,
+                )
+                scores, rows = scores[0], rows[0]
+                if expired is not None:
+                    valid = ~expired[rows]
+                    scores, rows = scores[valid][:k], rows[valid][:k]
+            else:
+                all_scores = self._scores(query_emb)
+                if expired is not None:
+                    all_scores[expired] = -np.inf
+                if k == 1:
+                    rows = np.array([int(np.argmax(all_scores))])
+                else:
+                    rows = np.argpartition(-all_scores, k - 1)[:k]
+                    rows = rows[np.argsort(-all_scores[rows])]
+                scores = all_scores[rows]
+
+            if min_score is not None:
+                used = rows[scores >= min_score]
+                self.last_access[used] = time.time()
+
+            return [(float(s), self.responses[int(i)]) for s, i in zip(scores, rows)]
+
+    def purge_expired(self) -> int:
+        """Drop expired rows; returns how many were removed"""
+        keep = self.expires_at[: self.size] > time.time()
+        removed = self.size - int(keep.sum())
+
+        if removed:
+            self._compact(keep)
+            SEMANTIC_CACHE_EVICTIONS.labels(reason="expired").inc(removed)
+        else:
+            self._refresh_next_expiry()
+
+        return removed
+
+    def remove_rows(self, rows: np.ndarray):
+        """Drop the given rows (capacity eviction)"""
+        keep = np.ones(self.size, dtype=bool)
+        keep[rows] = False
+        self._compact(keep)
+
+    def _scores(self, query_emb: np.ndarray) -> np.ndarray:
+        matrix = self.embeddings[: self.size]
+
+        if self.dtype == np.float32:
+            return matrix @ query_emb
+
+        # half-precision storage: upcast in blocks so the product still
+        # runs through float32 BLAS without copying the whole matrix
+        scores = np.empty(self.size, dtype=np.float32)
+        for start in range(0, self.size, SCORE_CHUNK_ROWS):
+            block = matrix[start : start + SCORE_CHUNK_ROWS].astype(np.float32)
+            scores[start : start + len(block)] = block @ query_emb
+        return scores
+
+    def _compact(self, keep: np.ndarray):
+        """Move kept rows to the front, preserving their order"""
+        rows = np.flatnonzero(keep)
+        kept = len(rows)
+
+        self.embeddings[:kept] = self.embeddings[rows]
+        self.expires_at[:kept] = self.expires_at[rows]
+        self.last_access[:kept] = self.last_access[rows]
+        self.entry_bytes[:kept] = self.entry_bytes[rows]
+        self.queries = [self.queries[i] for i in rows]
+        self.responses = [self.responses[i] for i in rows]
+        self.positions = {query: row for row, query in enumerate(self.queries)}
+        self.size = kept
+        self.nbytes = int(self.entry_bytes[:kept].sum())
+        self._refresh_next_expiry()
+
+    def _refresh_next_expiry(self):
+        if self.size:
+            self.next_expiry = float(self.expires_at[: self.size].min())
+        else:
+            self.next_expiry = float("inf")
 
+    def _grow(self):
+        capacity = len(self.embeddings) * 2
 
+        def grown(array):
+            new = np.empty((capacity,) + array.shape[1:], dtype=array.dtype)
+            new[: self.size] = array[: self.size]
+            return new
+
+        self.embeddings = grown(self.embeddings)
+        self.expires_at = grown(self.expires_at)
+        self.last_access = grown(self.last_access)
+        self.entry_bytes = grown(self.entry_bytes)
+
+
+# in-memory semantic cache store
+# one index per (assistant_type, llm_type, tool_enabled) context,
+# so lookups never scan entries from another assistant or provider.
+# The context tuple is the only per-entry metadata, shared by every
+# row of its partition.
+semantic_store: Dict[Tuple[str, str, bool], PartitionIndex] = {}
+_store_lock = threading.Lock()
+
+
+# ----------------------------
+# Utility functions
+# ----------------------------
 def cosine_similarity(a, b):
     """Compute cosine similarity"""
     return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
 
 
+def partition_key(config: dict, tool_enabled: bool) -> Tuple[str, str, bool]:
+    """Cache context that isolates semantic entries"""
+    return (
+        sys.intern(config["assistant_type"]),
+        sys.intern(config["llm_type"]),
+        bool(tool_enabled),
+    )
+
+
+def get_partition(config: dict, tool_enabled: bool, create: bool = False):
+    key = partition_key(config, tool_enabled)
+    index = semantic_store.get(key)
+
+    if index is None and create:
+        with _store_lock:
+            index = semantic_store.get(key)
+            if index is None:
+                index = PartitionIndex(
+                    embedding_dim(), dtype=settings.SEMANTIC_CACHE_DTYPE
+                )
+                semantic_store[key] = index
+
+    return index
+
+
 # ----------------------------
-# Lookup
+# Capacity management
 # ----------------------------
-def semantic_lookup(query: str, config: dict, tool_enabled: bool) -> Optional[str]:
+def _update_gauges():
+    SEMANTIC_CACHE_ENTRIES.set(semantic_cache_size())
+    SEMANTIC_CACHE_BYTES.set(semantic_cache_bytes())
+
+
+def _over_limits(entries: int, nbytes: int) -> bool:
+    return (
+        entries > settings.SEMANTIC_CACHE_MAX_ENTRIES
+        or nbytes > settings.SEMANTIC_CACHE_MAX_BYTES
+    )
+
+
+def enforce_limits() -> int:
     """
-    Check semantic cache for similar query.
-    Respects assistant type, llm type, and tool usage.
+    Bring the cache back under its entry and byte limits.
+
+    Expired rows go first; if that is not enough, the least recently
+    used rows across all partitions are evicted down to the low
+    watermark. Returns the number of rows evicted for capacity.
     """
+    if not _over_limits(semantic_cache_size(), semantic_cache_bytes()):
+        _update_gauges()
+        return 0
 
-    if not semantic_store:
-        return None
+    with _store_lock, ExitStack() as stack:
+        partitions = [semantic_store[key] for key in sorted(semantic_store)]
+        for index in partitions:
+            stack.enter_context(index.lock)
 
-    query_emb = get_embedding(query)
+        for index in partitions:
+            index.purge_expired()
 
-    best_score = 0
-    best_response = None
+        entries = sum(index.size for index in partitions)
+        nbytes = sum(index.nbytes for index in partitions)
 
-    for stored_query, data in semantic_store.items():
+        if not _over_limits(entries, nbytes):
+            victims = []
+        else:
+            # global LRU order over every row of every partition
+            last_access = np.concatenate(
+                [index.last_access[: index.size] for index in partitions]
+            )
+            entry_bytes = np.concatenate(
+                [index.entry_bytes[: index.size] for index in partitions]
+            )
+            offsets = np.cumsum([0] + [index.size for index in partitions])
+            order = np.argsort(last_access, kind="stable")
 
-        # 🔒 Context isolation
-        if data["assistant_type"] != config["assistant_type"]:
-            continue
+            target_entries = int(
+                settings.SEMANTIC_CACHE_MAX_ENTRIES * EVICTION_LOW_WATERMARK
+            )
+            target_bytes = int(settings.SEMANTIC_CACHE_MAX_BYTES * EVICTION_LOW_WATERMARK)
 
-        if data["llm_type"] != config["llm_type"]:
-            continue
+            evict_for_entries = max(0, entries - target_entries)
+            evict_for_bytes = 0
+            if nbytes > target_bytes:
+                freed = np.cumsum(entry_bytes[order])
+                evict_for_bytes = int(np.searchsorted(freed, nbytes - target_bytes)) + 1
 
-        if data["tool_enabled"] != tool_enabled:
-            continue
+            count = min(len(order), max(evict_for_entries, evict_for_bytes))
+            victims = order[:count]
 
-        stored_emb = data["embedding"]
-        score = cosine_similarity(query_emb, stored_emb)
+            for i, index in enumerate(partitions):
+                mask = (victims >= offsets[i]) & (victims < offsets[i + 1])
+                if mask.any():
+                    index.remove_rows(victims[mask] - offsets[i])
 
-        if score > best_score:
-            best_score = score
-            best_response = data["response"]
+            SEMANTIC_CACHE_EVICTIONS.labels(reason="capacity").inc(count)
 
-    if best_score >= SIM_THRESHOLD:
-        return best_response
+    _update_gauges()
+    return len(victims)
+
+
+# ----------------------------
+# Lookup
+# ----------------------------
+def semantic_lookup(
+    query: str,
+    config: dict,
+    tool_enabled: bool,
+    embedding: Optional[np.ndarray] = None,
+) -> Optional[bytes]:
+    """
+    Check semantic cache for similar query.
+    Respects assistant type, llm type, and tool usage.
+    A precomputed query embedding can be passed to skip encoding.
+    """
+
+    # 🔒 Context isolation: only the matching partition is searched
+    index = get_partition(config, tool_enabled)
+
+    if index is None or len(index) == 0:
+        return None
+
+    query_emb = embedding if embedding is not None else get_embedding(query)
+
+    matches = index.search(query_emb, k=1, min_score=SIM_THRESHOLD)
+
+    if matches and matches[0][0] >= SIM_THRESHOLD:
+        return matches[0][1]
 
     return None
 
@@ -83,22 +429,28 @@ def semantic_lookup(query: str, config: dict, tool_enabled: bool) -> Optional[st
 # Store
 # ----------------------------
 def semantic_store_response(
-    query: str, response: str, config: dict, tool_enabled: bool
+    query: str,
+    response: bytes,
+    config: dict,
+    tool_enabled: bool,
+    embedding: Optional[np.ndarray] = None,
+    ttl: float = DEFAULT_TTL,
 ):
-    """Store query + response in semantic cache with context metadata"""
-    emb = get_embedding(query)
+    """Store query + cache record in semantic cache with context metadata"""
+    emb = embedding if embedding is not None else get_embedding(query)
+
+    index = get_partition(config, tool_enabled, create=True)
+    index.add(query, emb, response, ttl)
 
-    semantic_store[query] = {
-        "embedding": emb,
-        "response": response,
-        "assistant_type": config["assistant_type"],
-        "llm_type": config["llm_type"],
-        "tool_enabled": tool_enabled,
-    }
+    enforce_limits()
 
 
 # ----------------------------
-# Debug helper
+# Debug helpers
 # ----------------------------
 def semantic_cache_size():
-    return len(semantic_store)
+    return sum(len(index) for index in list(semantic_store.values()))
+
+
+def semantic_cache_bytes():
+    return sum(index.nbytes for index in list(semantic_store.values()))
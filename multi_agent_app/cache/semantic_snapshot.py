@@ -0,0 +1,252 @@
+import asyncio
+import base64
+import gzip
+import json
+import os
+import shutil
+import time
+from contextlib import ExitStack
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # not on Windows: writers are not serialized there
+    fcntl = None
+
+from multi_agent_app.cache import semantic_cache
+from multi_agent_app.cache.cache_record import encode_record, make_entry
+from multi_agent_app.config.settings import settings
+from multi_agent_app.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+# ----------------------------
+# Semantic cache snapshots
+# ----------------------------
+# Layout under SEMANTIC_SNAPSHOT_DIR:
+#   CURRENT                     name of the latest complete snapshot
+#   snapshot-<ns>-<pid>/embeddings.npy  all rows, partition after partition
+#   snapshot-<ns>-<pid>/entries.json.gz queries, responses (base64 cache
+#                                       records), expiry, partitions
+#
+# A snapshot directory is fully written before CURRENT is switched to it,
+# so a crash mid-write never leaves a half-written snapshot behind.
+#
+# Every worker process snapshots its own cache into the same directory.
+# Writers take an exclusive lock on LOCK, so one publishes at a time, and
+# only snapshots older than the one just published are removed.
+
+SNAPSHOT_VERSION = 2
+EMBEDDINGS_FILE = "embeddings.npy"
+ENTRIES_FILE = "entries.json.gz"
+CURRENT_FILE = "CURRENT"
+LOCK_FILE = "LOCK"
+
+
+def _current_snapshot(root: str):
+    try:
+        with open(os.path.join(root, CURRENT_FILE)) as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return None
+
+    path = os.path.join(root, name)
+    return path if os.path.isdir(path) else None
+
+
+def _snapshot_time(name: str) -> int:
+    """Creation time (ns) encoded in a snapshot directory name"""
+    try:
+        return int(name.split("-")[1])
+    except (IndexError, ValueError):
+        return 0
+
+
+class _SnapshotLock:
+    """
+    Lock on LOCK_FILE: exclusive while a snapshot is published, shared
+    while one is read, so a reader never sees its snapshot removed.
+    """
+
+    def __init__(self, root: str, shared: bool = False):
+        self.path = os.path.join(root, LOCK_FILE)
+        self.shared = shared
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, "a")
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+
+
+def save_snapshot(root: str = None) -> int:
+    """Write the in-memory semantic cache to disk; returns rows written"""
+    root = root or settings.SEMANTIC_SNAPSHOT_DIR
+
+    # nothing cached: keep the previous snapshot (and do not load the
+    # embedding model just to learn its dimension)
+    if not semantic_cache.semantic_store:
+        return 0
+
+    os.makedirs(root, exist_ok=True)
+
+    # copy everything under the locks, write files after releasing them
+    with semantic_cache._store_lock, ExitStack() as stack:
+        keys = sorted(semantic_cache.semantic_store)
+        partitions = [semantic_cache.semantic_store[key] for key in keys]
+        for index in partitions:
+            stack.enter_context(index.lock)
+
+        for index in partitions:
+            index.purge_expired()
+
+        embeddings = np.concatenate(
+            [index.embeddings[: index.size] for index in partitions]
+        )
+        entries = {
+            "version": SNAPSHOT_VERSION,
+            "created_at": time.time(),
+            "partitions": [
+                {"key": list(key), "size": index.size}
+                for key, index in zip(keys, partitions)
+            ],
+            "queries": [q for index in partitions for q in index.queries],
+            "responses": [
+                base64.b64encode(r).decode("ascii")
+                for index in partitions
+                for r in index.responses
+            ],
+            "expires_at": [
+                float(t) for index in partitions for t in index.expires_at[: index.size]
+            ],
+        }
+
+    with _SnapshotLock(root):
+        name = f"snapshot-{time.time_ns()}-{os.getpid()}"
+        path = os.path.join(root, name)
+        os.makedirs(path)
+
+        np.save(os.path.join(path, EMBEDDINGS_FILE), embeddings)
+        with gzip.open(os.path.join(path, ENTRIES_FILE), "wt", encoding="utf-8") as f:
+            json.dump(entries, f, separators=(",", ":"))
+
+        # atomically publish the new snapshot, then drop older ones
+        tmp_current = os.path.join(root, CURRENT_FILE + ".tmp")
+        with open(tmp_current, "w") as f:
+            f.write(name)
+        os.replace(tmp_current, os.path.join(root, CURRENT_FILE))
+
+        published = _snapshot_time(name)
+        for entry in os.listdir(root):
+            if entry.startswith("snapshot-") and _snapshot_time(entry) < published:
+                shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+
+    return len(entries["queries"])
+
+
+def load_snapshot(root: str = None) -> int:
+    """Merge the latest snapshot into the cache; returns rows loaded"""
+    root = root or settings.SEMANTIC_SNAPSHOT_DIR
+
+    if not os.path.isdir(root):
+        return 0
+
+    with _SnapshotLock(root, shared=True):
+        return _load(root)
+
+
+def _load(root: str) -> int:
+    path = _current_snapshot(root)
+
+    if path is None:
+        return 0
+
+    with gzip.open(os.path.join(path, ENTRIES_FILE), "rt", encoding="utf-8") as f:
+        entries = json.load(f)
+
+    version = entries.get("version")
+
+    if version == SNAPSHOT_VERSION:
+        responses = [base64.b64decode(r) for r in entries["responses"]]
+    elif version == 1:
+        # version 1 stored bare answer strings
+        responses = [encode_record(make_entry(r)) for r in entries["responses"]]
+    else:
+        logger.warning(f"Ignoring semantic snapshot with version {version}")
+        return 0
+
+    # memory-mapped: only the rows that are still live get read
+    embeddings = np.load(os.path.join(path, EMBEDDINGS_FILE), mmap_mode="r")
+    if embeddings.shape[0] and embeddings.shape[1] != semantic_cache.embedding_dim():
+        logger.warning("Ignoring semantic snapshot built with another embedding size")
+        return 0
+
+    expires_at = np.asarray(entries["expires_at"], dtype=np.float64)
+    loaded = 0
+    start = 0
+
+    for partition in entries["partitions"]:
+        assistant_type, llm_type, tool_enabled = partition["key"]
+        end = start + partition["size"]
+
+        index = semantic_cache.get_partition(
+            {"assistant_type": assistant_type, "llm_type": llm_type},
+            tool_enabled,
+            create=True,
+        )
+        loaded += index.extend(
+            entries["queries"][start:end],
+            np.asarray(embeddings[start:end], dtype=index.dtype),
+            responses[start:end],
+            expires_at[start:end],
+        )
+        start = end
+
+    semantic_cache.enforce_limits()
+    return loaded
+
+
+async def run_snapshot_service():
+    """
+    Background task started from the FastAPI lifespan.
+
+    Loads the last snapshot without blocking startup (requests are served
+    while it loads and simply miss until it is done), then snapshots every
+    SEMANTIC_SNAPSHOT_INTERVAL seconds and once more on shutdown.
+    """
+    if not settings.SEMANTIC_SNAPSHOT_DIR or settings.SEMANTIC_CACHE_BACKEND != "memory":
+        return
+
+    try:
+        started = time.monotonic()
+        loaded = await asyncio.to_thread(load_snapshot)
+        logger.info(
+            f"Loaded {loaded} semantic cache entries in {time.monotonic() - started:.2f}s"
+        )
+
+    except Exception as e:
+        logger.error(f"Semantic snapshot load failed: {str(e)}")
+
+    try:
+        while True:
+            await asyncio.sleep(settings.SEMANTIC_SNAPSHOT_INTERVAL)
+            try:
+                await asyncio.to_thread(save_snapshot)
+            except Exception as e:
+                logger.error(f"Semantic snapshot failed: {str(e)}")
+
+    except asyncio.CancelledError:
+        # final snapshot on shutdown
+        try:
+            saved = await asyncio.to_thread(save_snapshot)
+            logger.info(f"Saved {saved} semantic cache entries on shutdown")
+        except Exception as e:
+            logger.error(f"Semantic snapshot failed: {str(e)}")
+        raise
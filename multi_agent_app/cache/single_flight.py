@@ -0,0 +1,368 @@
+import asyncio
+import json
+import time
+import uuid
+
+from redis.exceptions import RedisError
+
+from multi_agent_app.cache.redis_client import get_redis
+from multi_agent_app.config.settings import settings
+from multi_agent_app.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+# ----------------------------
+# Single-flight request coalescing
+# ----------------------------
+# Identical prompts that arrive while the first one is still being answered
+# share that answer instead of each calling the LLM.
+#
+# Within a process, followers await the leader's future (or subscribe to
+# its event stream). Across processes, the leader holds a Redis lock with a
+# short, renewed lease and publishes its result next to it; followers in
+# other workers poll for that result. If Redis is unavailable, coalescing
+# falls back to the current process only.
+
+LOCK_PREFIX = "inflight:"
+
+# Deletes the lock only if this leader still owns it
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Extends the lease only if this leader still owns it
+_RENEW_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+def _mark_retrieved(future: asyncio.Future):
+    # a failed flight nobody joined must not log "exception never retrieved"
+    if not future.cancelled():
+        future.exception()
+
+
+class _DistributedLock:
+    """Redis lease lock for one flight key, renewed while the leader runs"""
+
+    def __init__(self, namespace: str, key: str):
+        self.lock_key = f"{LOCK_PREFIX}{namespace}:{key}"
+        self.result_key = f"{self.lock_key}:result"
+        self.token = uuid.uuid4().hex
+        self._renewer = None
+
+    async def acquire(self) -> bool:
+        acquired = await get_redis().set(
+            self.lock_key,
+            self.token,
+            nx=True,
+            px=settings.SINGLE_FLIGHT_LEASE_MS,
+        )
+
+        if acquired:
+            # a result left over from an earlier flight must not be served
+            await get_redis().delete(self.result_key)
+            self._renewer = asyncio.create_task(self._renew())
+
+        return bool(acquired)
+
+    async def _renew(self):
+        interval = settings.SINGLE_FLIGHT_LEASE_MS / 3000
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await get_redis().eval(
+                    _RENEW_SCRIPT,
+                    1,
+                    self.lock_key,
+                    self.token,
+                    settings.SINGLE_FLIGHT_LEASE_MS,
+                )
+            except RedisError as e:
+                logger.warning(f"Failed to renew single-flight lease: {str(e)}")
+
+    async def publish(self, result):
+        await get_redis().set(
+            self.result_key,
+            json.dumps(result),
+            px=settings.SINGLE_FLIGHT_RESULT_TTL_MS,
+        )
+
+    async def release(self):
+        if self._renewer:
+            self._renewer.cancel()
+
+        try:
+            await get_redis().eval(_RELEASE_SCRIPT, 1, self.lock_key, self.token)
+        except RedisError as e:
+            logger.warning(f"Failed to release single-flight lock: {str(e)}")
+
+    async def wait_for_result(self):
+        """
+        Follower side: poll for the leader's published result.
+        Returns None if the leader finished without publishing one
+        (it failed), Redis is unavailable or the wait timed out.
+        """
+        redis = get_redis()
+        deadline = time.monotonic() + settings.SINGLE_FLIGHT_WAIT_SECONDS
+
+        try:
+            return await self._poll(redis, deadline)
+        except RedisError as e:
+            logger.warning(f"Single-flight result unavailable: {str(e)}")
+            return None
+
+    async def _poll(self, redis, deadline):
+        while time.monotonic() < deadline:
+            # result and lock state in one round trip
+            raw, holder = await redis.mget(self.result_key, self.lock_key)
+            if raw:
+                return json.loads(raw)
+
+            if holder is None:
+                # released without publishing: the leader failed
+                return None
+
+            await asyncio.sleep(settings.SINGLE_FLIGHT_POLL_SECONDS)
+
+        return None
+
+
+async def try_lock(namespace: str, key: str):
+    """
+    Acquire the lease lock for key without waiting.
+    Returns the held lock (call release() when done), or None if another
+    request already holds it.
+    """
+    lock = _DistributedLock(namespace, key)
+    return lock if await lock.acquire() else None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent awaitable calls by key.
+
+    do() returns (result, shared) where shared is True when the result
+    came from another request's call. Results must be JSON-serializable
+    so they can be handed to other processes.
+
+    The call runs in its own task, so a caller that is cancelled (client
+    disconnect, abandoned batch) never cancels the flight its followers
+    are waiting on.
+    """
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self._calls: dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn):
+        flight = self._calls.get(key)
+        if flight is not None:
+            result, _ = await asyncio.shield(flight)
+            return result, True
+
+        flight = asyncio.create_task(self._run_distributed(key, fn))
+        flight.add_done_callback(_mark_retrieved)
+        flight.add_done_callback(lambda _: self._forget(key, flight))
+        self._calls[key] = flight
+
+        return await asyncio.shield(flight)
+
+    def _forget(self, key: str, flight: asyncio.Task):
+        if self._calls.get(key) is flight:
+            del self._calls[key]
+
+    async def _run_distributed(self, key: str, fn):
+        lock = _DistributedLock(self.namespace, key)
+
+        try:
+            acquired = await lock.acquire()
+        except RedisError as e:
+            logger.warning(f"Single-flight lock unavailable: {str(e)}")
+            return await fn(), False
+
+        if not acquired:
+            result = await lock.wait_for_result()
+            if result is not None:
+                return result, True
+
+            # leader failed or timed out: answer this request ourselves
+            return await fn(), False
+
+        try:
+            result = await fn()
+            try:
+                await lock.publish(result)
+            except RedisError as e:
+                logger.warning(f"Failed to publish single-flight result: {str(e)}")
+            return result, False
+
+        finally:
+            await lock.release()
+
+
+class StreamFanout:
+    """
+    Runs one event stream and replays it to any number of subscribers.
+
+    The source is consumed by its own task, so it completes (and its
+    side effects such as the cache write happen once) even if the client
+    that started it disconnects.
+    """
+
+    def __init__(self, source, on_complete=None):
+        self._events = []
+        self._done = False
+        self._error = None
+        self._changed = asyncio.Condition()
+        self._on_complete = on_complete
+        self.task = asyncio.create_task(self._pump(source))
+
+    async def _pump(self, source):
+        try:
+            async for event in source:
+                async with self._changed:
+                    self._events.append(event)
+                    self._changed.notify_all()
+
+        except Exception as e:
+            self._error = e
+
+        finally:
+            if self._on_complete:
+                await self._on_complete(self._events, self._error)
+            async with self._changed:
+                self._done = True
+                self._changed.notify_all()
+
+    async def subscribe(self):
+        position = 0
+
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(
+                    lambda: len(self._events) > position or self._done
+                )
+                batch = self._events[position:]
+                done = self._done
+
+            for event in batch:
+                yield event
+            position += len(batch)
+
+            if done and position == len(self._events):
+                if self._error:
+                    raise self._error
+                return
+
+
+def collect_stream_result(events) -> dict:
+    """Answer and suggestions carried by a finished event stream"""
+    answer = "".join(e["content"] for e in events if e["type"] == "token")
+    suggestions = next(
+        (e["suggestions"] for e in events if e["type"] == "suggestions"), []
+    )
+    return {"answer": answer, "suggestions": suggestions}
+
+
+class StreamSingleFlight:
+    """
+    Single-flight for event streams.
+
+    subscribe() returns (events, shared). In-process followers join the
+    leader's StreamFanout; followers in other processes wait for the
+    leader's published result and receive it through replay().
+
+    The flight is registered before the leader's first await, so
+    requests arriving while it takes the lock or starts its stream join
+    it instead of polling Redis (or, with Redis down, leading their own).
+    """
+
+    def __init__(self, namespace: str, replay):
+        self.namespace = namespace
+        self._replay = replay
+        # key -> future resolved with the flight's StreamFanout (or None
+        # if the leader could not start one)
+        self._flights: dict[str, asyncio.Future] = {}
+
+    async def subscribe(self, key: str, start):
+        pending = self._flights.get(key)
+        if pending is not None:
+            fanout = await asyncio.shield(pending)
+            if fanout is None:
+                # the leader failed to start: try again ourselves
+                return await self.subscribe(key, start)
+            return fanout.subscribe(), True
+
+        pending = asyncio.get_running_loop().create_future()
+        self._flights[key] = pending
+        fanout = None
+
+        try:
+            fanout, shared = await self._lead(key, start, pending)
+            return fanout.subscribe(), shared
+
+        finally:
+            if fanout is None:
+                self._forget(key, pending)
+            if not pending.done():
+                pending.set_result(fanout)
+
+    def _forget(self, key: str, pending: asyncio.Future):
+        if self._flights.get(key) is pending:
+            del self._flights[key]
+
+    async def _lead(self, key: str, start, pending: asyncio.Future):
+        lock = _DistributedLock(self.namespace, key)
+
+        try:
+            acquired = await lock.acquire()
+        except RedisError as e:
+            logger.warning(f"Single-flight lock unavailable: {str(e)}")
+            lock, acquired = None, True
+
+        if not acquired:
+            # another process leads: local followers share one wait
+            async def forget(events, error):
+                self._forget(key, pending)
+
+            return StreamFanout(self._follow(lock, start), on_complete=forget), True
+
+        async def finish(events, error):
+            self._forget(key, pending)
+            if lock is None:
+                return
+            try:
+                if error is None:
+                    await lock.publish(collect_stream_result(events))
+            except RedisError as e:
+                logger.warning(f"Failed to publish stream result: {str(e)}")
+            finally:
+                await lock.release()
+
+        try:
+            source = await start()
+        except BaseException:
+            if lock is not None:
+                await lock.release()
+            raise
+
+        return StreamFanout(source, on_complete=finish), False
+
+    async def _follow(self, lock, start):
+        result = await lock.wait_for_result()
+
+        if result is not None:
+            async for event in self._replay(result["answer"], result["suggestions"]):
+                yield event
+            return
+
+        # leader failed or timed out: stream this request ourselves
+        async for event in await start():
+            yield event
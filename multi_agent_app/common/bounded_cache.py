@@ -0,0 +1,151 @@
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import REGISTRY
+
+# Every BoundedCache registers itself here so its stats can be exported
+_registry: "weakref.WeakValueDictionary[str, BoundedCache]" = weakref.WeakValueDictionary()
+
+_MISSING = object()
+
+
+class BoundedCache:
+    """
+    Thread-safe LRU mapping with a size limit and idle expiry.
+
+    - max_size: least recently used entries are evicted beyond this
+    - ttl: seconds an entry may go unused before it expires (None = never)
+
+    No method awaits, so calls are also atomic on an asyncio event loop.
+    Hits, misses and evictions are exported to Prometheus under the
+    cache's name.
+    """
+
+    def __init__(self, name: str, max_size: int, ttl: float = None):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+
+        # key -> (value, last access time); order = least recently used first
+        self._data: "OrderedDict[object, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = {"capacity": 0, "idle": 0}
+
+        _registry[name] = self
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING, count=False) is not _MISSING
+
+    def get(self, key, default=None, count: bool = True):
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is not None and self._expired(entry, now):
+                del self._data[key]
+                self.evictions["idle"] += 1
+                entry = None
+
+            if entry is None:
+                if count:
+                    self.misses += 1
+                return default
+
+            self._data[key] = (entry[0], now)
+            self._data.move_to_end(key)
+            if count:
+                self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        now = time.monotonic()
+
+        with self._lock:
+            self._data[key] = (value, now)
+            self._data.move_to_end(key)
+            self._evict(now)
+
+    def get_or_create(self, key, factory):
+        """Return the cached value, building it with factory() on a miss"""
+        with self._lock:
+            value = self.get(key, _MISSING)
+            if value is _MISSING:
+                value = factory()
+                self.set(key, value)
+            return value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return default if entry is None else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def _expired(self, entry, now) -> bool:
+        return self.ttl is not None and now - entry[1] > self.ttl
+
+    def _evict(self, now):
+        # idle entries sit at the front, since access order is LRU order
+        while self._data:
+            oldest = next(iter(self._data.values()))
+            if not self._expired(oldest, now):
+                break
+            self._data.popitem(last=False)
+            self.evictions["idle"] += 1
+
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions["capacity"] += 1
+
+
+class BoundedCacheCollector:
+    """Exports the stats of every live BoundedCache on each scrape"""
+
+    def collect(self):
+        entries = GaugeMetricFamily(
+            "ai_agent_object_cache_entries",
+            "Entries held by in-process object caches",
+            labels=["cache"],
+        )
+        hits = CounterMetricFamily(
+            "ai_agent_object_cache_hits",
+            "In-process object cache hits",
+            labels=["cache"],
+        )
+        misses = CounterMetricFamily(
+            "ai_agent_object_cache_misses",
+            "In-process object cache misses",
+            labels=["cache"],
+        )
+        evictions = CounterMetricFamily(
+            "ai_agent_object_cache_evictions",
+            "In-process object cache evictions",
+            labels=["cache", "reason"],
+        )
+
+        for name, cache in list(_registry.items()):
+            entries.add_metric([name], len(cache))
+            hits.add_metric([name], cache.hits)
+            misses.add_metric([name], cache.misses)
+            for reason, count in cache.evictions.items():
+                evictions.add_metric([name, reason], count)
+
+        yield entries
+        yield hits
+        yield misses
+        yield evictions
+
+
+REGISTRY.register(BoundedCacheCollector())
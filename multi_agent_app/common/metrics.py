@@ -0,0 +1,241 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+# ---------------------------------------------------------
+# Custom metrics used for Grafana dashboards
+# ---------------------------------------------------------
+# Defined in one place so the backend and the cache layer
+# can both record them.
+# ---------------------------------------------------------
+
+# Total number of requests processed by the backend
+# Labels allow grouping by assistant type and model
+REQUEST_COUNT = Counter(
+    "ai_agent_requests_total",
+    "Total requests",
+    ["assistant", "model"],
+)
+
+# Total cache hits (exact cache or semantic cache)
+CACHE_HITS = Counter(
+    "ai_agent_cache_hits_total",
+    "Cache hits",
+    ["type"],
+)
+
+# Latency buckets spanning millisecond cache hits to long
+# multi-step LLM calls (Prometheus defaults stop at 10s)
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0,
+)
+
+# Histogram measuring response latency of AI requests
+REQUEST_LATENCY = Histogram(
+    "ai_agent_latency_seconds",
+    "Latency of AI responses",
+    buckets=LATENCY_BUCKETS,
+)
+
+# /chat/batch items, kept out of ai_agent_latency_seconds so batch runs
+# do not skew the interactive latency dashboards. Hits are timed from
+# the start of the batch (one bulk lookup), misses from their own start.
+# cache: exact, semantic, stale, miss or coalesced
+BATCH_ITEM_LATENCY = Histogram(
+    "ai_agent_batch_item_latency_seconds",
+    "Latency of /chat/batch items",
+    ["cache"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Time spent in each pipeline stage (common/timing.py)
+# stage: validate, exact_lookup, embed, semantic_lookup, agent_setup,
+#        agent, tool_search, stream_setup, classify, cache_store, total
+# cache: exact, semantic, stale, miss, coalesced or disabled
+STAGE_LATENCY = Histogram(
+    "ai_agent_stage_latency_seconds",
+    "Latency per request pipeline stage",
+    ["stage", "assistant", "model", "cache"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Total number of backend errors
+ERROR_COUNT = Counter(
+    "ai_agent_errors_total",
+    "Total errors",
+)
+
+# Requests answered by joining an identical in-flight request
+# instead of calling the LLM themselves
+COALESCED_REQUESTS = Counter(
+    "ai_agent_coalesced_requests_total",
+    "Requests served by single-flight coalescing",
+    ["endpoint"],
+)
+
+# Web searches by where the result came from:
+# "memory", "redis", "coalesced" or "live" (search API call)
+SEARCH_REQUESTS = Counter(
+    "ai_agent_search_requests_total",
+    "Web searches by result source",
+    ["source"],
+)
+
+# ---------------------------------------------------------
+# LLM token usage (core/usage.py)
+# ---------------------------------------------------------
+# From the usage metadata providers return with each model
+# response; a request with tool calls sums every model call.
+
+LLM_PROMPT_TOKENS = Counter(
+    "ai_agent_llm_prompt_tokens_total",
+    "Prompt (input) tokens sent to the LLM",
+    ["assistant", "model"],
+)
+
+LLM_COMPLETION_TOKENS = Counter(
+    "ai_agent_llm_completion_tokens_total",
+    "Completion (output) tokens generated by the LLM",
+    ["assistant", "model"],
+)
+
+LLM_TOTAL_TOKENS = Counter(
+    "ai_agent_llm_tokens_total",
+    "Prompt plus completion tokens",
+    ["assistant", "model"],
+)
+
+# Completion tokens per second of agent run time
+LLM_TOKENS_PER_SECOND = Histogram(
+    "ai_agent_llm_tokens_per_second",
+    "LLM output throughput per request",
+    ["assistant", "model"],
+    buckets=(5, 10, 25, 50, 100, 200, 400, 800, 1600),
+)
+
+# Estimated tokens not spent thanks to cache hits: the total
+# usage of the original LLM call, stored with the cache entry
+TOKENS_AVOIDED = Counter(
+    "ai_agent_cache_tokens_avoided_total",
+    "LLM tokens avoided by cache hits",
+    ["assistant", "model", "type"],
+)
+
+# ---------------------------------------------------------
+# Streaming responses (/chat-stream)
+# ---------------------------------------------------------
+# Recorded while the NDJSON stream is written to the client, so
+# they reflect what the user sees. cache: exact, semantic, stale
+# (replayed answers), miss, coalesced or disabled.
+
+# Request start until the first token event is sent
+STREAM_TIME_TO_FIRST_TOKEN = Histogram(
+    "ai_agent_stream_ttft_seconds",
+    "Time to first streamed token",
+    ["assistant", "model", "cache"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Time between consecutive token events
+STREAM_TOKEN_GAP = Histogram(
+    "ai_agent_stream_token_gap_seconds",
+    "Gap between streamed tokens",
+    ["assistant", "model", "cache"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+# Request start until the stream ended (completed or not)
+STREAM_DURATION = Histogram(
+    "ai_agent_stream_duration_seconds",
+    "Total duration of streamed responses",
+    ["assistant", "model", "cache"],
+    buckets=LATENCY_BUCKETS,
+)
+
+STREAM_BYTES = Counter(
+    "ai_agent_stream_bytes_total",
+    "Bytes written to streaming clients",
+    ["assistant", "model", "cache"],
+)
+
+# Token events sent (one per model chunk; replayed cache
+# answers are sent in larger chunks)
+STREAM_TOKENS = Counter(
+    "ai_agent_stream_tokens_total",
+    "Token events streamed",
+    ["assistant", "model", "cache"],
+)
+
+# Streams that ended before the final "done" event was sent
+STREAM_DISCONNECTS = Counter(
+    "ai_agent_stream_disconnects_total",
+    "Clients that disconnected mid-stream",
+    ["assistant", "model", "cache"],
+)
+
+# ---------------------------------------------------------
+# Semantic cache capacity
+# ---------------------------------------------------------
+
+# Entries currently held in the in-memory semantic cache
+SEMANTIC_CACHE_ENTRIES = Gauge(
+    "ai_agent_semantic_cache_entries",
+    "Entries in the semantic cache",
+)
+
+# Approximate memory used by semantic cache entries
+SEMANTIC_CACHE_BYTES = Gauge(
+    "ai_agent_semantic_cache_bytes",
+    "Approximate bytes used by semantic cache entries",
+)
+
+# Entries removed from the semantic cache
+# reason: "expired" (TTL elapsed) or "capacity" (size limits)
+SEMANTIC_CACHE_EVICTIONS = Counter(
+    "ai_agent_semantic_cache_evictions_total",
+    "Semantic cache evictions",
+    ["reason"],
+)
+
+# ---------------------------------------------------------
+# Embedding scheduler
+# ---------------------------------------------------------
+
+# Texts encoded per micro-batch
+EMBEDDING_BATCH_SIZE = Histogram(
+    "ai_agent_embedding_batch_size",
+    "Texts per embedding batch",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+
+# Time a text waited in the scheduler queue before its batch started
+EMBEDDING_QUEUE_WAIT = Histogram(
+    "ai_agent_embedding_queue_wait_seconds",
+    "Embedding queue wait before encoding",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+
+# ---------------------------------------------------------
+# Cache backend (Redis)
+# ---------------------------------------------------------
+
+# Round-trip time per Redis operation (command name or "pipeline")
+CACHE_BACKEND_LATENCY = Histogram(
+    "ai_agent_cache_backend_latency_seconds",
+    "Redis operation latency",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+# Failed Redis operations
+# reason: exception type, "response" (error reply) or "circuit_open"
+CACHE_BACKEND_FAILURES = Counter(
+    "ai_agent_cache_backend_failures_total",
+    "Failed Redis operations",
+    ["operation", "reason"],
+)
+
+# Circuit breaker state: 0 closed, 1 open (cache bypassed), 2 half-open
+CACHE_BREAKER_STATE = Gauge(
+    "ai_agent_cache_breaker_state",
+    "Redis circuit breaker state",
+)
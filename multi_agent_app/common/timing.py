@@ -0,0 +1,128 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from multi_agent_app.common.metrics import (
+    STAGE_LATENCY,
+    STREAM_BYTES,
+    STREAM_DISCONNECTS,
+    STREAM_DURATION,
+    STREAM_TIME_TO_FIRST_TOKEN,
+    STREAM_TOKEN_GAP,
+    STREAM_TOKENS,
+)
+
+# ---------------------------------------------------------
+# Per-stage request timing
+# ---------------------------------------------------------
+# An endpoint starts a StageTimer for its request; code along
+# the pipeline (cache_manager, core/agent, tools) wraps its work
+# in `with stage("name"):`. The timer lives in a context
+# variable, so tasks spawned for the request see it and no
+# function signatures change. Without a timer (batch requests,
+# background jobs) stage() does nothing.
+#
+# finish() exports every stage to STAGE_LATENCY, labelled by
+# assistant, model and cache outcome. Stages that end after
+# finish() (the cache write runs once the response is sent)
+# are exported immediately with the same labels.
+#
+# All durations use time.perf_counter (monotonic).
+# ---------------------------------------------------------
+
+_current: ContextVar = ContextVar("stage_timer", default=None)
+
+
+class StageTimer:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.labels = None
+
+    def add(self, name: str, seconds: float):
+        if self.labels is not None:
+            STAGE_LATENCY.labels(stage=name, **self.labels).observe(seconds)
+            return
+
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def finish(self, assistant: str, model: str, cache: str) -> float:
+        """Export the recorded stages and the total; returns the total"""
+        total = self.elapsed()
+        self.labels = {"assistant": assistant, "model": model, "cache": cache}
+
+        for name, seconds in self.stages.items():
+            STAGE_LATENCY.labels(stage=name, **self.labels).observe(seconds)
+        STAGE_LATENCY.labels(stage="total", **self.labels).observe(total)
+
+        return total
+
+    def server_timing(self) -> str:
+        """Server-Timing header value for the stages recorded so far"""
+        parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()]
+        parts.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(parts)
+
+
+def start_timer() -> StageTimer:
+    timer = StageTimer()
+    _current.set(timer)
+    return timer
+
+
+@contextmanager
+def stage(name: str):
+    timer = _current.get()
+
+    if timer is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - started)
+
+
+# ---------------------------------------------------------
+# Streaming response timing
+# ---------------------------------------------------------
+# A StreamRecorder follows one NDJSON stream as its events are
+# handed to the client: time to first token, gaps between
+# tokens, bytes and token events sent, total duration, and
+# whether the client left before the end.
+# ---------------------------------------------------------
+class StreamRecorder:
+
+    def __init__(self, started: float, assistant: str, model: str, cache: str):
+        self.started = started
+        self.labels = {"assistant": assistant, "model": model, "cache": cache}
+        self.last_token = None
+
+    def sent(self, event: dict, data: bytes):
+        now = time.perf_counter()
+
+        STREAM_BYTES.labels(**self.labels).inc(len(data))
+
+        if event.get("type") != "token":
+            return
+
+        STREAM_TOKENS.labels(**self.labels).inc()
+
+        if self.last_token is None:
+            STREAM_TIME_TO_FIRST_TOKEN.labels(**self.labels).observe(now - self.started)
+        else:
+            STREAM_TOKEN_GAP.labels(**self.labels).observe(now - self.last_token)
+
+        self.last_token = now
+
+    def close(self, completed: bool):
+        STREAM_DURATION.labels(**self.labels).observe(time.perf_counter() - self.started)
+
+        if not completed:
+            STREAM_DISCONNECTS.labels(**self.labels).inc()
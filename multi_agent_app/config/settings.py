@@ -10,6 +10,7 @@ class Settings:
     # API keys for LLM providers
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+    TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 
     # Available AI assistant types
     ASSISTANT_TYPES = [
@@ -136,6 +137,110 @@ Be precise, neutral, and legally accurate.
     # Temperature ranges
     ALLOWED_TEMPERATURE_VALUES = [i / 10 for i in range(0, 11)]
 
+    # Redis connection used by the backend cache
+    REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+    REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+    REDIS_DB = int(os.getenv("REDIS_DB", "0"))
+    # Pool size and timeouts (seconds): a slow Redis fails fast
+    REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+    REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "0.5"))
+    REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.5"))
+    # Circuit breaker: bypass Redis after this many consecutive failures,
+    # retry after the reset period
+    REDIS_BREAKER_FAILURES = int(os.getenv("REDIS_BREAKER_FAILURES", "5"))
+    REDIS_BREAKER_RESET_SECONDS = float(os.getenv("REDIS_BREAKER_RESET_SECONDS", "10"))
+
+    # Embedding model and runtime used by the semantic cache:
+    # "torch" (reference), "torch-int8" (quantized) or "onnx" (ONNX Runtime,
+    # optionally a specific exported file such as onnx/model_qint8_avx512.onnx)
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+    EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE", "")
+
+    # Embedding thread pool (keeps the model off the event loop)
+    EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", "2"))
+    # Max embeddings queued or running before new callers wait
+    EMBEDDING_MAX_PENDING = int(os.getenv("EMBEDDING_MAX_PENDING", "32"))
+    # Micro-batching: encode queued texts together once this many are
+    # waiting or the oldest has waited this long
+    EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32"))
+    EMBEDDING_BATCH_MAX_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5"))
+
+    # Semantic cache backend:
+    # "memory" - per-process index (single worker)
+    # "redis"  - shared vector index in Redis, used by every worker/replica
+    SEMANTIC_CACHE_BACKEND = os.getenv("SEMANTIC_CACHE_BACKEND", "memory")
+    SEMANTIC_INDEX_NAME = os.getenv("SEMANTIC_INDEX_NAME", "semantic_cache_idx")
+
+    # In-memory semantic cache limits (least recently used entries are
+    # evicted once either limit is exceeded)
+    SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "50000"))
+    SEMANTIC_CACHE_MAX_BYTES = int(
+        os.getenv("SEMANTIC_CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+    )
+    # Storage type for cached embeddings: "float32" or "float16"
+    SEMANTIC_CACHE_DTYPE = os.getenv("SEMANTIC_CACHE_DTYPE", "float32")
+
+    # Cache record compression ("zlib", or "zstd" when zstandard is
+    # installed); records smaller than CACHE_COMPRESS_MIN_BYTES stay raw
+    CACHE_COMPRESSION = os.getenv("CACHE_COMPRESSION", "zlib")
+    CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "512"))
+
+    # In-process object caches (core/helper.py, core/search.py): max
+    # entries and the seconds an entry may stay unused before it is dropped
+    LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "32"))
+    AGENT_CACHE_SIZE = int(os.getenv("AGENT_CACHE_SIZE", "64"))
+    TOOL_CACHE_SIZE = int(os.getenv("TOOL_CACHE_SIZE", "1024"))
+    OBJECT_CACHE_IDLE_SECONDS = int(os.getenv("OBJECT_CACHE_IDLE_SECONDS", "3600"))
+    TOOL_CACHE_IDLE_SECONDS = int(os.getenv("TOOL_CACHE_IDLE_SECONDS", "600"))
+
+    # Longest time an exact cache entry is served stale (while it is
+    # refreshed in the background) after its category TTL has passed
+    EXACT_CACHE_MAX_STALE_SECONDS = int(
+        os.getenv("EXACT_CACHE_MAX_STALE_SECONDS", "86400")
+    )
+
+    # Single-flight coalescing of identical in-flight prompts
+    SINGLE_FLIGHT_LEASE_MS = int(os.getenv("SINGLE_FLIGHT_LEASE_MS", "30000"))
+    SINGLE_FLIGHT_RESULT_TTL_MS = int(os.getenv("SINGLE_FLIGHT_RESULT_TTL_MS", "30000"))
+    SINGLE_FLIGHT_WAIT_SECONDS = float(os.getenv("SINGLE_FLIGHT_WAIT_SECONDS", "120"))
+    SINGLE_FLIGHT_POLL_SECONDS = float(os.getenv("SINGLE_FLIGHT_POLL_SECONDS", "0.1"))
+
+    # On-disk snapshots of the in-memory semantic cache (empty dir disables)
+    SEMANTIC_SNAPSHOT_DIR = os.getenv("SEMANTIC_SNAPSHOT_DIR", "cache_snapshots")
+    SEMANTIC_SNAPSHOT_INTERVAL = int(os.getenv("SEMANTIC_SNAPSHOT_INTERVAL", "300"))
+
+    # Conversational memory (LangGraph checkpointer):
+    # "memory" - per-process, lost on restart
+    # "sqlite" - file at CHECKPOINT_SQLITE_PATH, survives restarts
+    # "redis"  - shared by every worker/replica (needs Redis Stack)
+    CHECKPOINTER_BACKEND = os.getenv("CHECKPOINTER_BACKEND", "memory")
+    CHECKPOINT_SQLITE_PATH = os.getenv("CHECKPOINT_SQLITE_PATH", "checkpoints.sqlite")
+    # Threads unused for this long are deleted
+    MEMORY_THREAD_TTL_SECONDS = int(os.getenv("MEMORY_THREAD_TTL_SECONDS", "86400"))
+    MEMORY_PRUNE_INTERVAL = int(os.getenv("MEMORY_PRUNE_INTERVAL", "600"))
+    # User turns kept per thread, and history tokens sent with each turn
+    MEMORY_MAX_TURNS = int(os.getenv("MEMORY_MAX_TURNS", "20"))
+    MEMORY_MAX_TOKENS = int(os.getenv("MEMORY_MAX_TOKENS", "4000"))
+
+    # Web search tool: "tavily" (search API) or "stub" (offline results)
+    SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "tavily")
+    SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "2"))
+    SEARCH_TIMEOUT_SECONDS = float(os.getenv("SEARCH_TIMEOUT_SECONDS", "10"))
+    # Pooled connections to the search API shared by all requests
+    SEARCH_MAX_CONNECTIONS = int(os.getenv("SEARCH_MAX_CONNECTIONS", "20"))
+
+    # /chat/batch: max items per call and concurrent LLM calls per provider
+    BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+    BATCH_PROVIDER_CONCURRENCY = {
+        "Groq": int(os.getenv("BATCH_CONCURRENCY_GROQ", "4")),
+        "OpenAI": int(os.getenv("BATCH_CONCURRENCY_OPENAI", "8")),
+    }
+
+    # Add a Server-Timing header (per-stage durations) to chat responses;
+    # off by default since it exposes internal timings to clients
+    SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING_HEADER", "false").lower() == "true"
+
 
 # Create a single settings instance for the entire application
 settings = Settings()
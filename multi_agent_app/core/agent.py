@@ -1,12 +1,64 @@
-from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
-from langchain_tavily import TavilySearch
-from fastapi.responses import StreamingResponse
-import asyncio
+import time
 
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 
+from multi_agent_app.common.timing import stage
 from multi_agent_app.config.settings import settings
-from multi_agent_app.core.helper import get_llm, get_agent, get_cached_search
-from multi_agent_app.core.helper import TAVILY_TOOL
+from multi_agent_app.core.helper import get_llm, get_agent
+from multi_agent_app.core.search import web_search
+from multi_agent_app.core.memory import touch_thread
+from multi_agent_app.core.response_parser import parse_response
+from multi_agent_app.core.usage import add_usage, empty_usage, record_usage, run_usage
+
+
+def _chunk_text(content) -> str:
+    """Extract text from a streamed message chunk"""
+    if isinstance(content, str):
+        return content
+
+    # Some providers stream a list of content blocks
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block)
+        for block in content
+    )
+
+
+# Streams the agent run as it happens instead of waiting for the result.
+# Yields event dicts:
+#   {"type": "token", "content": str}       model output as it is generated
+#   {"type": "tool_start", "name", "input"} a tool call began
+#   {"type": "tool_end", "name"}            the tool call returned
+#   {"type": "usage", "usage": dict}        token usage, once at the end
+async def stream_agent_events(agent, state, config, assistant_type, llm_model):
+
+    usage = empty_usage()
+    started = time.perf_counter()
+
+    async for event in agent.astream_events(state, config=config, version="v2"):
+
+        kind = event["event"]
+
+        if kind == "on_chat_model_stream":
+            text = _chunk_text(event["data"]["chunk"].content)
+            if text:
+                yield {"type": "token", "content": text}
+
+        elif kind == "on_tool_start":
+            yield {
+                "type": "tool_start",
+                "name": event["name"],
+                "input": event["data"].get("input"),
+            }
+
+        elif kind == "on_tool_end":
+            yield {"type": "tool_end", "name": event["name"]}
+
+        elif kind == "on_chat_model_end":
+            add_usage(usage, event["data"].get("output"))
+
+    record_usage(assistant_type, llm_model, usage, time.perf_counter() - started)
+
+    yield {"type": "usage", "usage": usage}
 
 
 # Main function responsible for generating AI responses
@@ -26,12 +78,13 @@ async def generate_response(
     assistant_prompt = settings.ASSISTANT_PROMPTS[assistant_type]
 
     # Initialize the selected LLM
-    llm = get_llm(
-        provider=llm_type,
-        model_name=llm_model,
-        streaming=enable_streaming,
-        temperature=temperature,
-    )
+    with stage("agent_setup"):
+        llm = get_llm(
+            provider=llm_type,
+            model_name=llm_model,
+            streaming=enable_streaming,
+            temperature=temperature,
+        )
 
     # ------------------------------------------------------------------
     # NEW LOGIC: Disable search for basic knowledge questions
@@ -55,8 +108,8 @@ async def generate_response(
     # streaming
     streaming = enable_streaming
 
-    # Add Tavily search tool only if needed
-    tools = [TAVILY_TOOL] if use_search else []
+    # Add the cached web search tool only if needed
+    tools = [web_search] if use_search else []
 
     # ------------------------------------------------------------------
     # Improved base guardrails
@@ -101,64 +154,52 @@ async def generate_response(
     }
 
     # Get the right agent based on UI selection
-    agent = get_agent(llm, tools, enable_memory)
+    with stage("agent_setup"):
+        agent = get_agent(llm, tools, enable_memory)
 
     # Prepare config only if memory is enabled
     config = {"configurable": {"thread_id": thread_id}} if enable_memory else None
 
-    if streaming:
-
-        # Run agent normally first
-        if enable_memory:
-            response = await agent.ainvoke(state, config=config)
-        else:
-            response = await agent.ainvoke(state)
-
-        final_text = ""
-
-        if "messages" in response:
-            for message in reversed(response["messages"]):
-                if isinstance(message, AIMessage):
-                    final_text = message.content
-                    break
+    # Keep the thread alive for another MEMORY_THREAD_TTL_SECONDS
+    if enable_memory:
+        with stage("agent_setup"):
+            await touch_thread(thread_id)
 
-        async def fake_stream():
-            for char in final_text:
-                yield char
-                await asyncio.sleep(0.01)  # adjust speed here
+    if streaming:
 
-        return StreamingResponse(fake_stream(), media_type="text/plain")
+        # Hand back an async generator of events; the backend frames them
+        # for the client as they are produced
+        return stream_agent_events(agent, state, config, assistant_type, llm_model)
 
     else:
 
         # Invoke agent asynchronously and no streaming response
-        if enable_memory:
-            response = await agent.ainvoke(state, config=config)
-        else:
-            response = await agent.ainvoke(state)
+        # (LLM calls plus any tool calls; tool_search is also timed on its own)
+        with stage("agent"):
+            started = time.perf_counter()
+            if enable_memory:
+                response = await agent.ainvoke(state, config=config)
+            else:
+                response = await agent.ainvoke(state)
+            seconds = time.perf_counter() - started
 
         # Check messages list
         if "messages" in response:
-            for message in reversed(response["messages"]):
-                if isinstance(message, AIMessage):
-
-                    content = message.content
 
-                    answer = content
-                    suggestions = []
+            # Tokens of every model call in this run (tool loops included)
+            usage = run_usage(response["messages"])
+            record_usage(assistant_type, llm_model, usage, seconds)
 
-                    if "SUGGESTIONS:" in content:
-                        parts = content.split("SUGGESTIONS:")
-                        answer = parts[0].replace("ANSWER:", "").strip()
-
-                        suggestion_lines = parts[1].strip().split("\n")
+            for message in reversed(response["messages"]):
+                if isinstance(message, AIMessage):
 
-                        for line in suggestion_lines:
-                            line = line.strip()
-                            if line and line[0].isdigit():
-                                suggestions.append(line[2:].strip())
+                    answer, suggestions = parse_response(message.content)
 
-                    return {"answer": answer, "suggestions": suggestions}
+                    return {
+                        "answer": answer,
+                        "suggestions": suggestions,
+                        "usage": usage,
+                    }
 
         # If response structure is unexpected
         raise ValueError("Unexpected agent response structure")
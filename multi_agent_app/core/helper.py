@@ -1,35 +1,33 @@
-from langchain_groq import ChatGroq
-from langchain_openai import ChatOpenAI
-from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import MemorySaver
-from langchain_tavily import TavilySearch
+from multi_agent_app.common.bounded_cache import BoundedCache
+from multi_agent_app.config.settings import settings
+from multi_agent_app.core.memory import get_checkpointer, trim_history
 
 
-# LangGraph memory checkpoint (persistent during runtime)
-memory = MemorySaver()
-
 # -------------------------------------------------
-# GLOBAL CACHES (avoid recreating agents + llms + tools)
+# GLOBAL CACHES (avoid recreating agents + llms)
+# Bounded LRU caches: entries unused for longer than their
+# idle TTL are dropped, stats are exported to Prometheus.
+# Search results are cached in core/search.py
 # -------------------------------------------------
 
-LLM_CACHE = {}
-AGENT_CACHE = {}
-TOOL_CACHE = {}
-
-TAVILY_TOOL = TavilySearch(max_results=2)
-
-
-# This ensures repeated searches return in milliseconds instead of seconds
-def get_cached_search(query):
+LLM_CACHE = BoundedCache(
+    "llm",
+    max_size=settings.LLM_CACHE_SIZE,
+    ttl=settings.OBJECT_CACHE_IDLE_SECONDS,
+)
+AGENT_CACHE = BoundedCache(
+    "agent",
+    max_size=settings.AGENT_CACHE_SIZE,
+    ttl=settings.OBJECT_CACHE_IDLE_SECONDS,
+)
 
-    if query in TOOL_CACHE:
-        return TOOL_CACHE[query]
 
-    search = TavilySearch(max_results=3)
-    result = search.invoke(query)
-
-    TOOL_CACHE[query] = result
-    return result
+# Provider SDKs and LangGraph are imported on first use (or by
+# preload_agent_stack during warm-up): importing them costs seconds
+def preload_agent_stack():
+    import langchain_groq  # noqa: F401
+    import langchain_openai  # noqa: F401
+    import langgraph.prebuilt  # noqa: F401
 
 
 # This ensures LLM instance is reused
@@ -37,10 +35,13 @@ def get_llm(provider: str, model_name: str, streaming: bool, temperature: int):
 
     cache_key = (provider, model_name, streaming, temperature)
 
-    if cache_key in LLM_CACHE:
-        return LLM_CACHE[cache_key]
+    llm = LLM_CACHE.get(cache_key)
+    if llm is not None:
+        return llm
 
     if provider == "Groq":
+        from langchain_groq import ChatGroq
+
         llm = ChatGroq(
             model=model_name,
             streaming=streaming,
@@ -48,37 +49,52 @@ def get_llm(provider: str, model_name: str, streaming: bool, temperature: int):
         )
 
     elif provider == "OpenAI":
+        from langchain_openai import ChatOpenAI
+
         llm = ChatOpenAI(
             model=model_name,
             streaming=streaming,
             temperature=temperature,
+            # report token usage on streamed responses too
+            stream_usage=True,
         )
 
     else:
         raise ValueError("Unsupported LLM provider")
 
-    LLM_CACHE[cache_key] = llm
+    LLM_CACHE.set(cache_key, llm)
     return llm
 
 
 # This ensures the agent graph is compiled only once
 def get_agent(llm, tools, enable_memory):
 
+    # Everything that changes the compiled graph: provider, model and
+    # sampling settings of the LLM, the bound tools and the checkpointer
     cache_key = (
-        llm.model_name,
-        tuple(str(t) for t in tools),
-        enable_memory,
+        type(llm).__name__,
+        getattr(llm, "model_name", None),
+        getattr(llm, "temperature", None),
+        getattr(llm, "streaming", None),
+        tuple(getattr(t, "name", str(t)) for t in tools),
+        id(get_checkpointer()) if enable_memory else None,
     )
 
-    if cache_key in AGENT_CACHE:
-        return AGENT_CACHE[cache_key]
+    agent = AGENT_CACHE.get(cache_key)
+    if agent is not None:
+        return agent
+
+    from langgraph.prebuilt import create_react_agent
 
     if enable_memory:
 
+        # Checkpointer from core/memory.py (memory, SQLite or Redis);
+        # trim_history bounds the stored thread and the tokens per turn
         agent = create_react_agent(
             model=llm,
             tools=tools,
-            checkpointer=memory,
+            checkpointer=get_checkpointer(),
+            pre_model_hook=trim_history,
         )
 
     else:
@@ -88,5 +104,5 @@ def get_agent(llm, tools, enable_memory):
             tools=tools,
         )
 
-    AGENT_CACHE[cache_key] = agent
+    AGENT_CACHE.set(cache_key, agent)
     return agent
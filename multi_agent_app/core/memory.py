@@ -0,0 +1,216 @@
+import asyncio
+import time
+
+from langchain_core.messages import HumanMessage, RemoveMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately, trim_messages
+from langgraph.checkpoint.memory import MemorySaver
+
+from multi_agent_app.config.settings import settings
+from multi_agent_app.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+# ----------------------------
+# Conversational memory
+# ----------------------------
+# The LangGraph checkpointer that stores each thread's messages:
+#   "memory" - per-process MemorySaver (lost on restart)
+#   "sqlite" - local SQLite file, survives restarts
+#   "redis"  - shared by every worker/replica (needs Redis Stack)
+#
+# Threads unused for MEMORY_THREAD_TTL_SECONDS are deleted. Stored history
+# is capped at MEMORY_MAX_TURNS user turns and each model call only sees
+# the most recent MEMORY_MAX_TOKENS of it.
+
+_checkpointer = None
+_sqlite_conn = None
+
+# thread_id -> last use (memory backend; sqlite keeps this in a table)
+_thread_activity: dict[str, float] = {}
+
+_ACTIVITY_TABLE = """
+CREATE TABLE IF NOT EXISTS thread_activity (
+    thread_id TEXT PRIMARY KEY,
+    last_seen REAL NOT NULL
+)
+"""
+
+
+async def init_checkpointer():
+    """Create the configured checkpointer; called from the FastAPI lifespan"""
+    global _checkpointer, _sqlite_conn
+
+    backend = settings.CHECKPOINTER_BACKEND
+
+    if backend == "sqlite":
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+        _sqlite_conn = await aiosqlite.connect(settings.CHECKPOINT_SQLITE_PATH)
+        await _sqlite_conn.execute(_ACTIVITY_TABLE)
+        await _sqlite_conn.commit()
+
+        _checkpointer = AsyncSqliteSaver(_sqlite_conn)
+        await _checkpointer.setup()
+
+    elif backend == "redis":
+        from langgraph.checkpoint.redis.aio import AsyncRedisSaver
+
+        # Redis expires idle threads itself; reads push the expiry back
+        _checkpointer = AsyncRedisSaver(
+            redis_url=f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}",
+            ttl={
+                "default_ttl": settings.MEMORY_THREAD_TTL_SECONDS / 60,
+                "refresh_on_read": True,
+            },
+        )
+        await _checkpointer.asetup()
+
+    elif backend == "memory":
+        _checkpointer = MemorySaver()
+
+    else:
+        raise ValueError(f"Unsupported checkpointer backend: {backend}")
+
+    logger.info(f"Conversational memory backend: {backend}")
+    return _checkpointer
+
+
+async def close_checkpointer():
+    global _checkpointer, _sqlite_conn
+
+    if _sqlite_conn is not None:
+        await _sqlite_conn.close()
+        _sqlite_conn = None
+
+    _checkpointer = None
+
+
+def get_checkpointer():
+    """
+    The active checkpointer. Falls back to an in-process MemorySaver when
+    init_checkpointer() has not run (e.g. scripts outside the API).
+    """
+    global _checkpointer
+
+    if _checkpointer is None:
+        _checkpointer = MemorySaver()
+
+    return _checkpointer
+
+
+# ----------------------------
+# Per-thread TTL
+# ----------------------------
+async def touch_thread(thread_id: str):
+    """Record that a thread was used, pushing back its expiry"""
+    now = time.time()
+
+    if _sqlite_conn is not None:
+        await _sqlite_conn.execute(
+            "INSERT INTO thread_activity (thread_id, last_seen) VALUES (?, ?) "
+            "ON CONFLICT(thread_id) DO UPDATE SET last_seen = excluded.last_seen",
+            (thread_id, now),
+        )
+        await _sqlite_conn.commit()
+
+    else:
+        _thread_activity[thread_id] = now
+
+
+async def prune_expired_threads() -> int:
+    """Delete threads idle for longer than the TTL; returns threads removed"""
+    if settings.CHECKPOINTER_BACKEND == "redis" or _checkpointer is None:
+        return 0
+
+    cutoff = time.time() - settings.MEMORY_THREAD_TTL_SECONDS
+
+    if _sqlite_conn is not None:
+        async with _sqlite_conn.execute(
+            "SELECT thread_id FROM thread_activity WHERE last_seen < ?", (cutoff,)
+        ) as cursor:
+            expired = [row[0] for row in await cursor.fetchall()]
+    else:
+        expired = [t for t, seen in list(_thread_activity.items()) if seen < cutoff]
+
+    for thread_id in expired:
+        await _checkpointer.adelete_thread(thread_id)
+
+        if _sqlite_conn is not None:
+            await _sqlite_conn.execute(
+                "DELETE FROM thread_activity WHERE thread_id = ? AND last_seen < ?",
+                (thread_id, cutoff),
+            )
+        else:
+            _thread_activity.pop(thread_id, None)
+
+    if _sqlite_conn is not None:
+        await _sqlite_conn.commit()
+
+    return len(expired)
+
+
+async def run_memory_service():
+    """
+    Background task started from the FastAPI lifespan: deletes expired
+    threads every MEMORY_PRUNE_INTERVAL seconds until shutdown.
+    """
+    while True:
+        await asyncio.sleep(settings.MEMORY_PRUNE_INTERVAL)
+        try:
+            removed = await prune_expired_threads()
+            if removed:
+                logger.info(f"Deleted {removed} expired conversation threads")
+        except Exception as e:
+            logger.error(f"Conversation pruning failed: {str(e)}")
+
+
+# ----------------------------
+# History windowing
+# ----------------------------
+def _split_turns(messages):
+    """Index of the first message of each user turn"""
+    return [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+
+
+def trim_history(state):
+    """
+    pre_model_hook for create_react_agent.
+
+    Every turn adds its own system prompt, so only the latest one is kept.
+    Stored history is cut to the last MEMORY_MAX_TURNS user turns (always
+    at a turn boundary, so tool calls keep their results), and the model
+    only receives the newest MEMORY_MAX_TOKENS of what remains.
+    """
+    from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+    messages = state["messages"]
+
+    system = next((m for m in reversed(messages) if isinstance(m, SystemMessage)), None)
+    history = [m for m in messages if not isinstance(m, SystemMessage)]
+
+    turns = _split_turns(history)
+    if len(turns) > settings.MEMORY_MAX_TURNS:
+        history = history[turns[-settings.MEMORY_MAX_TURNS]:]
+
+    kept = ([system] if system else []) + history
+
+    window = trim_messages(
+        kept,
+        max_tokens=settings.MEMORY_MAX_TOKENS,
+        token_counter=count_tokens_approximately,
+        strategy="last",
+        start_on="human",
+        include_system=True,
+    )
+
+    # the current question must reach the model even if it alone is too long
+    if not any(isinstance(m, HumanMessage) for m in window) and turns:
+        window = ([system] if system else []) + history[_split_turns(history)[-1]:]
+
+    update = {"llm_input_messages": window}
+
+    if len(kept) != len(messages):
+        update["messages"] = [RemoveMessage(id=REMOVE_ALL_MESSAGES), *kept]
+
+    return update
@@ -0,0 +1,112 @@
+# Parsing of the "ANSWER: ... SUGGESTIONS: 1. ..." format the system
+# prompt asks every model to follow.
+
+ANSWER_MARKER = "ANSWER:"
+SUGGESTIONS_MARKER = "SUGGESTIONS:"
+
+
+def parse_suggestions(text: str) -> list[str]:
+    """Extract numbered suggestion lines ("1. ...")"""
+    suggestions = []
+
+    for line in text.strip().split("\n"):
+        line = line.strip()
+        if line and line[0].isdigit():
+            suggestions.append(line[2:].strip())
+
+    return suggestions
+
+
+def parse_response(content: str) -> tuple[str, list[str]]:
+    """Split a complete model response into (answer, suggestions)"""
+    answer = content
+    suggestions = []
+
+    if SUGGESTIONS_MARKER in content:
+        parts = content.split(SUGGESTIONS_MARKER)
+        answer = parts[0].replace(ANSWER_MARKER, "").strip()
+        suggestions = parse_suggestions(parts[1])
+
+    return answer, suggestions
+
+
+def _partial_marker_length(text: str, marker: str) -> int:
+    """Length of the longest suffix of text that starts the marker"""
+    for size in range(min(len(text), len(marker) - 1), 0, -1):
+        if marker.startswith(text[-size:]):
+            return size
+    return 0
+
+
+class StreamingResponseParser:
+    """
+    Incremental version of parse_response for token streams.
+
+    feed() returns the answer text that is safe to show so far: the leading
+    "ANSWER:" marker is dropped and anything that might be the start of
+    "SUGGESTIONS:" is held back until the next token decides it. Everything
+    after the marker is collected and parsed by finish().
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._started = False
+        self._in_suggestions = False
+        self._suggestion_text = ""
+        self._answer_parts: list[str] = []
+        self.suggestions: list[str] = []
+
+    @property
+    def answer(self) -> str:
+        """Full answer text emitted so far"""
+        return "".join(self._answer_parts).strip()
+
+    def feed(self, text: str) -> str:
+        if self._in_suggestions:
+            self._suggestion_text += text
+            return ""
+
+        self._buffer += text
+
+        if not self._started:
+            head = self._buffer.lstrip()
+
+            # Not enough text yet to know whether the answer marker follows
+            if ANSWER_MARKER.startswith(head):
+                return ""
+
+            if head.startswith(ANSWER_MARKER):
+                head = head[len(ANSWER_MARKER) :]
+
+            self._buffer = head.lstrip()
+            self._started = True
+
+            if not self._buffer:
+                return ""
+
+        marker_at = self._buffer.find(SUGGESTIONS_MARKER)
+
+        if marker_at != -1:
+            emit = self._buffer[:marker_at]
+            self._suggestion_text = self._buffer[marker_at + len(SUGGESTIONS_MARKER) :]
+            self._buffer = ""
+            self._in_suggestions = True
+        else:
+            hold = _partial_marker_length(self._buffer, SUGGESTIONS_MARKER)
+            emit = self._buffer[: len(self._buffer) - hold]
+            self._buffer = self._buffer[len(self._buffer) - hold :]
+
+        self._answer_parts.append(emit)
+        return emit
+
+    def finish(self) -> str:
+        """Flush held-back answer text and parse the collected suggestions"""
+        emit = ""
+
+        if not self._in_suggestions:
+            emit = self._buffer
+            self._answer_parts.append(emit)
+        self._buffer = ""
+
+        self.suggestions = parse_suggestions(self._suggestion_text)
+        return emit
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import time
+
+import httpx
+from langchain_core.tools import tool
+from redis.exceptions import RedisError
+
+from multi_agent_app.cache.cache_policy import get_search_ttl
+from multi_agent_app.cache.embeddings import aget_embedding
+from multi_agent_app.cache.query_classifier import classify_embedding
+from multi_agent_app.cache.redis_client import get_redis
+from multi_agent_app.cache.single_flight import SingleFlight
+from multi_agent_app.common.bounded_cache import BoundedCache
+from multi_agent_app.common.logger import get_logger
+from multi_agent_app.common.metrics import SEARCH_REQUESTS
+from multi_agent_app.common.timing import stage
+from multi_agent_app.config.settings import settings
+
+logger = get_logger(__name__)
+
+# ----------------------------
+# Web search layer
+# ----------------------------
+# Lookup order for a search:
+#   1. in-process LRU ("tool" object cache)
+#   2. Redis, shared by every worker, kept for a category TTL
+#   3. the search backend, once per query even when identical searches
+#      arrive concurrently (single-flight)
+#
+# SEARCH_BACKEND selects "tavily" (HTTP API over a pooled async client)
+# or "stub" (canned offline results for tests and local runs).
+
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+SEARCH_KEY_PREFIX = "search:"
+
+# key -> (expires_at, results)
+_results = BoundedCache(
+    "tool",
+    max_size=settings.TOOL_CACHE_SIZE,
+    ttl=settings.TOOL_CACHE_IDLE_SECONDS,
+)
+
+_flights = SingleFlight("search")
+
+# Shared connection pool (created on first use so it belongs to the
+# serving event loop)
+_client = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=settings.SEARCH_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=settings.SEARCH_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.SEARCH_MAX_CONNECTIONS,
+            ),
+        )
+
+    return _client
+
+
+async def close_search_client():
+    global _client
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def search_key(query: str, max_results: int) -> str:
+    raw = f"{settings.SEARCH_BACKEND}|{max_results}|{' '.join(query.split()).lower()}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+# ----------------------------
+# Backends
+# ----------------------------
+async def _tavily_search(query: str, max_results: int) -> dict:
+    response = await _get_client().post(
+        TAVILY_SEARCH_URL,
+        headers={"Authorization": f"Bearer {settings.TAVILY_API_KEY}"},
+        json={"query": query, "max_results": max_results},
+    )
+    response.raise_for_status()
+    data = response.json()
+
+    # only what the model needs: fewer tokens in the tool message
+    return {
+        "query": query,
+        "results": [
+            {
+                "title": r.get("title"),
+                "url": r.get("url"),
+                "content": r.get("content"),
+            }
+            for r in data.get("results", [])[:max_results]
+        ],
+    }
+
+
+async def _stub_search(query: str, max_results: int) -> dict:
+    return {
+        "query": query,
+        "results": [
+            {
+                "title": f"Result {i + 1} for {query}",
+                "url": f"https://example.com/search/{i + 1}",
+                "content": f"Offline stub result {i + 1} for: {query}",
+            }
+            for i in range(max_results)
+        ],
+    }
+
+
+SEARCH_BACKENDS = {
+    "tavily": _tavily_search,
+    "stub": _stub_search,
+}
+
+
+# ----------------------------
+# Cached search
+# ----------------------------
+async def _search_ttl(query: str) -> int:
+    embedding = await aget_embedding(query)
+    return get_search_ttl(classify_embedding(embedding))
+
+
+async def search(query: str, max_results: int = None) -> dict:
+    """Search the web through the caches; returns {"query", "results"}"""
+    max_results = max_results or settings.SEARCH_MAX_RESULTS
+    key = search_key(query, max_results)
+
+    cached = _results.get(key)
+    if cached is not None and cached[0] > time.time():
+        SEARCH_REQUESTS.labels(source="memory").inc()
+        return cached[1]
+
+    try:
+        raw = await get_redis().get(SEARCH_KEY_PREFIX + key)
+    except RedisError as e:
+        logger.warning(f"Search cache unavailable: {str(e)}")
+        raw = None
+
+    if raw:
+        entry = json.loads(raw)
+        _results.set(key, (entry["expires_at"], entry["results"]))
+        SEARCH_REQUESTS.labels(source="redis").inc()
+        return entry["results"]
+
+    async def fetch():
+        backend = SEARCH_BACKENDS.get(settings.SEARCH_BACKEND)
+        if backend is None:
+            raise ValueError(f"Unsupported search backend: {settings.SEARCH_BACKEND}")
+
+        results = await backend(query, max_results)
+        ttl = await _search_ttl(query)
+        expires_at = time.time() + ttl
+
+        _results.set(key, (expires_at, results))
+        try:
+            await get_redis().set(
+                SEARCH_KEY_PREFIX + key,
+                json.dumps({"expires_at": expires_at, "results": results}),
+                ex=ttl,
+            )
+        except RedisError as e:
+            logger.warning(f"Failed to cache search results: {str(e)}")
+
+        return results
+
+    results, shared = await _flights.do(key, fetch)
+    SEARCH_REQUESTS.labels(source="coalesced" if shared else "live").inc()
+    return results
+
+
+# Tool bound to the LangGraph agent
+@tool("web_search")
+async def web_search(query: str) -> dict:
+    """Search the web for current information such as news, prices or
+    recent events. Input is a concise search query."""
+    with stage("tool_search"):
+        return await search(query)
@@ -0,0 +1,68 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from multi_agent_app.common.metrics import (
+    LLM_COMPLETION_TOKENS,
+    LLM_PROMPT_TOKENS,
+    LLM_TOKENS_PER_SECOND,
+    LLM_TOTAL_TOKENS,
+    TOKENS_AVOIDED,
+)
+
+# ----------------------------
+# Token usage accounting
+# ----------------------------
+# Usage is kept as {"input_tokens", "output_tokens", "total_tokens"},
+# the fields of langchain's usage_metadata. It is recorded per request
+# and stored with cache entries, so every later hit on an entry can
+# count the tokens it avoided.
+
+USAGE_FIELDS = ("input_tokens", "output_tokens", "total_tokens")
+
+
+def empty_usage() -> dict:
+    return dict.fromkeys(USAGE_FIELDS, 0)
+
+
+def add_usage(usage: dict, message) -> dict:
+    """Add a model message's usage_metadata (if any) to usage in place"""
+    metadata = getattr(message, "usage_metadata", None) or {}
+    for field in USAGE_FIELDS:
+        usage[field] += int(metadata.get(field) or 0)
+    return usage
+
+
+def run_usage(messages) -> dict:
+    """Usage of the AI messages produced after the last human message"""
+    usage = empty_usage()
+
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            break
+        if isinstance(message, AIMessage):
+            add_usage(usage, message)
+
+    return usage
+
+
+def record_usage(assistant: str, model: str, usage: dict, seconds: float):
+    """Export one request's token usage and output throughput"""
+    LLM_PROMPT_TOKENS.labels(assistant=assistant, model=model).inc(usage["input_tokens"])
+    LLM_COMPLETION_TOKENS.labels(assistant=assistant, model=model).inc(
+        usage["output_tokens"]
+    )
+    LLM_TOTAL_TOKENS.labels(assistant=assistant, model=model).inc(usage["total_tokens"])
+
+    if usage["output_tokens"] and seconds > 0:
+        LLM_TOKENS_PER_SECOND.labels(assistant=assistant, model=model).observe(
+            usage["output_tokens"] / seconds
+        )
+
+
+def record_tokens_avoided(assistant: str, model: str, cache_type: str, entry: dict):
+    """Count the original usage of a cache entry that was served again"""
+    tokens = (entry.get("usage") or {}).get("total_tokens", 0)
+
+    if tokens:
+        TOKENS_AVOIDED.labels(assistant=assistant, model=model, type=cache_type).inc(
+            tokens
+        )
@@ -1,5 +1,6 @@
 import streamlit as st
 import requests
+import json
 import time
 import uuid
 
@@ -115,16 +116,46 @@ def handle_chat(
                     duration = 0
                 else:
                     with st.chat_message("assistant"):
+                        status = st.empty()
                         placeholder = st.empty()
 
-                        for chunk in response.iter_content(chunk_size=None):
-                            if chunk:
-                                text = chunk.decode("utf-8")
-                                ai_reply += text
+                        # Backend streams NDJSON: one event per line
+                        for line in response.iter_lines():
+                            if not line:
+                                continue
+
+                            event = json.loads(line)
+                            event_type = event.get("type")
+
+                            if event_type == "cache":
+                                cache_type = event.get("cache", "miss")
+
+                            elif event_type == "token":
+                                ai_reply += event["content"]
                                 placeholder.markdown(ai_reply)
 
+                            elif event_type == "tool_start":
+                                status.caption(f"Using {event['name']}...")
+
+                            elif event_type == "tool_end":
+                                status.empty()
+
+                            elif event_type == "suggestions":
+                                if enable_suggestions:
+                                    suggestions = event.get("suggestions", [])
+
+                            elif event_type == "error":
+                                st.error(event.get("detail", "Error"))
+
                     duration = round(time.time() - start_time, 2)
 
+                    if (
+                        enable_session_cache
+                        and cache_type in ("miss", "coalesced")
+                        and ai_reply
+                    ):
+                        st.session_state.cache_store[cache_key] = ai_reply
+
             else:
                 start_time = time.time()
                 response = requests.post(BACKEND_URL, json=payload, timeout=120)
@@ -140,7 +171,7 @@ def handle_chat(
                     else:
                         suggestions = []
                     cache_type = data.get("cache", "miss")
-                    if enable_session_cache and cache_type == "miss":
+                    if enable_session_cache and cache_type in ("miss", "coalesced"):
                         st.session_state.cache_store[cache_key] = ai_reply
                 else:
                     st.error(response.text)
@@ -170,22 +201,32 @@ def handle_chat(
     elif cache_type == "semantic":
         mode = f"{icon('hub')}Global cache hit (semantic)"
 
+    elif cache_type == "stale":
+        mode = f"{icon('history')}Global cache hit (stale, refreshing)"
+
+    elif cache_type == "coalesced":
+        mode = f"{icon('merge')}Shared live call (identical request in flight)"
+
     else:
-        if enable_streaming:
-            mode = f"{icon('sync')}Live call (streaming, no cache)"
+        live_icon = icon("cloud")
 
-        else:
-            if enable_session_cache and enable_backend_cache:
-                mode = f"{icon('cloud')}Live call (session + global cache enabled)"
+        if enable_session_cache and enable_backend_cache:
+            cache_label = "session + global cache enabled"
 
-            elif enable_session_cache and not enable_backend_cache:
-                mode = f"{icon('cloud')}Live call (session cache only)"
+        elif enable_session_cache and not enable_backend_cache:
+            cache_label = "session cache only"
 
-            elif not enable_session_cache and enable_backend_cache:
-                mode = f"{icon('cloud')}Live call (global cache only)"
+        elif not enable_session_cache and enable_backend_cache:
+            cache_label = "global cache only"
 
-            else:
-                mode = f"{icon('block')}Live call (no cache)"
+        else:
+            live_icon = icon("block")
+            cache_label = "no cache"
+
+        if enable_streaming:
+            cache_label = f"streaming, {cache_label}"
+
+        mode = f"{live_icon}Live call ({cache_label})"
 
     # ----------------------------
     # Append assistant
@@ -1,6 +1,8 @@
 import subprocess
 import threading
 import time
+import urllib.error
+import urllib.request
 from dotenv import load_dotenv
 from multi_agent_app.common.logger import get_logger
 from multi_agent_app.common.custom_exception import CustomException
@@ -79,6 +81,30 @@ def run_backend():
         logger.error(str(e))
 
 
+# -----------------------------------
+# Wait for backend readiness
+# -----------------------------------
+READY_URL = "http://127.0.0.1:8000/readyz"
+
+
+def wait_until_ready(url=READY_URL, timeout=180, interval=0.5):
+    """Poll /readyz until the backend is warmed up or timeout seconds pass"""
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=2) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, OSError):
+            # not listening yet, or 503 while warming up
+            pass
+
+        time.sleep(interval)
+
+    return False
+
+
 # -----------------------------------
 # Frontend
 # -----------------------------------
@@ -108,7 +134,11 @@ if __name__ == "__main__":
         backend_thread.daemon = True
         backend_thread.start()
 
-        time.sleep(3)
+        started = time.monotonic()
+        if wait_until_ready():
+            logger.info(f"Backend ready in {time.monotonic() - started:.1f}s")
+        else:
+            logger.warning("Backend not ready yet, starting frontend anyway")
 
         # Start Frontend (main thread)
         run_frontend()
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import fakeredis
+import pytest
+from redis.exceptions import ConnectionError
+
+from multi_agent_app.cache import single_flight
+from multi_agent_app.cache.single_flight import StreamSingleFlight
+
+# the leader's first token arrives quickly, the whole answer much later
+FIRST_TOKEN_DELAY = 0.05
+TOKEN_DELAY = 0.1
+TOKENS = 10
+
+
+class DownRedis:
+    """Every command fails as if Redis were unreachable"""
+
+    def __getattr__(self, name):
+        async def fail(*args, **kwargs):
+            raise ConnectionError("Redis is down")
+
+        return fail
+
+
+@pytest.fixture(params=["redis", "redis-down"])
+def redis(request, monkeypatch):
+    if request.param == "redis":
+        client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    else:
+        client = DownRedis()
+    monkeypatch.setattr(single_flight, "get_redis", lambda: client)
+
+
+async def replay(answer, suggestions):
+    yield {"type": "token", "content": answer}
+
+
+async def first_event_times(subscribers: int):
+    flights = StreamSingleFlight("test", replay)
+    starts = 0
+
+    async def events():
+        await asyncio.sleep(FIRST_TOKEN_DELAY)
+        for i in range(TOKENS):
+            yield {"type": "token", "content": f"{i} "}
+            await asyncio.sleep(TOKEN_DELAY)
+
+    async def start():
+        nonlocal starts
+        starts += 1
+        await asyncio.sleep(0.01)  # e.g. building the agent
+        return events()
+
+    async def subscriber():
+        began = time.monotonic()
+        stream, shared = await flights.subscribe("key", start)
+        first = None
+        tokens = []
+        async for event in stream:
+            if first is None:
+                first = time.monotonic() - began
+            tokens.append(event["content"])
+        return first, shared, "".join(tokens)
+
+    results = await asyncio.gather(*(subscriber() for _ in range(subscribers)))
+    return results, starts
+
+
+def test_concurrent_stream_subscribers_share_the_leader(redis):
+    results, starts = asyncio.run(first_event_times(4))
+
+    assert starts == 1
+    assert [shared for _, shared, _ in results] == [False, True, True, True]
+
+    answer = "".join(f"{i} " for i in range(TOKENS))
+    for first, _, tokens in results:
+        # followers see the first token with the leader, not after the
+        # whole answer has been generated
+        assert first < FIRST_TOKEN_DELAY + TOKEN_DELAY * 3
+        assert tokens == answer